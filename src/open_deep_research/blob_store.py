@@ -0,0 +1,73 @@
+"""Content-addressed storage for large text payloads kept out of graph state."""
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+# Prefix of references stored in state in place of the offloaded text
+BLOB_REF_PREFIX = "blob://sha256:"
+
+
+def is_blob_ref(value: Any) -> bool:
+    """Check whether a value is a reference to an offloaded blob."""
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX) and len(value) == len(BLOB_REF_PREFIX) + 64
+
+
+class BlobStore:
+    """Local filesystem blob store addressed by the SHA-256 of each blob's content.
+
+    Identical payloads are stored once, and blobs are immutable, so references
+    can be copied freely between states, checkpoints and threads.
+    """
+
+    def __init__(self, root: str | Path):
+        """Open (or create) a blob store rooted at the given directory."""
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        """Return the file holding a blob, fanned out by digest prefix."""
+        return self.root / digest[:2] / digest[2:]
+
+    def put(self, content: str) -> str:
+        """Store content and return its blob reference."""
+        encoded = content.encode("utf-8")
+        digest = hashlib.sha256(encoded).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial blob
+            file_descriptor, temp_path = tempfile.mkstemp(dir=path.parent)
+            try:
+                with os.fdopen(file_descriptor, "wb") as temp_file:
+                    temp_file.write(encoded)
+                os.replace(temp_path, path)
+            except BaseException:
+                Path(temp_path).unlink(missing_ok=True)
+                raise
+        return f"{BLOB_REF_PREFIX}{digest}"
+
+    def get(self, ref: str) -> Optional[str]:
+        """Return the content of a blob reference, or None if the blob is missing."""
+        path = self._path(ref[len(BLOB_REF_PREFIX):])
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            logging.warning(f"Blob {ref} not found in {self.root}")
+            return None
+
+    def offload(self, content: str, threshold_chars: int) -> str:
+        """Store content longer than threshold_chars and return its reference, else return it unchanged."""
+        if len(content) <= threshold_chars:
+            return content
+        return self.put(content)
+
+    def resolve(self, value: str) -> str:
+        """Return the content behind a blob reference, or the value itself if it is not one."""
+        if not is_blob_ref(value):
+            return value
+        content = self.get(value)
+        return content if content is not None else f"[Content unavailable: {value} not found]"
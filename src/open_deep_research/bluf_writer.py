@@ -1,7 +1,6 @@
 """BLUF writer implementation for generating executive summaries from MDX reports."""
 
 import json
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 
@@ -9,12 +8,7 @@ from open_deep_research.configuration import Configuration
 from open_deep_research.prompts import bluf_writer_base_prompt
 from open_deep_research.schemas import BlufDocument
 from open_deep_research.state import AgentState
-from open_deep_research.utils import get_api_key_for_model
-
-# Initialize a configurable model for BLUF writing
-configurable_model = init_chat_model(
-    configurable_fields=("model", "max_tokens", "api_key"),
-)
+from open_deep_research.utils import get_api_key_for_model, get_configured_model
 
 
 async def bluf_writer(state: AgentState, config: RunnableConfig):
@@ -47,11 +41,10 @@ async def bluf_writer(state: AgentState, config: RunnableConfig):
     }
     
     # Configure model with structured output and retry logic
-    bluf_model = (
-        configurable_model
-        .with_structured_output(BlufDocument)
-        .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
-        .with_config(bluf_model_config)
+    bluf_model = get_configured_model(
+        bluf_model_config,
+        output_schema=BlufDocument,
+        max_retries=configurable.max_structured_output_retries
     )
     
     # Step 3: Format the prompt with MDX JSON input
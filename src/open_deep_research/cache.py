@@ -0,0 +1,215 @@
+"""Cache backends and request coalescing for expensive search and summarization work."""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+def make_cache_key(*parts: str) -> str:
+    """Build a stable content-addressed cache key from string parts.
+
+    Args:
+        *parts: Strings identifying the cached value (model name, content, etc.)
+
+    Returns:
+        Hex-encoded SHA-256 digest of the length-prefixed parts
+    """
+    hasher = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") never collide
+        hasher.update(len(encoded).to_bytes(8, "big"))
+        hasher.update(encoded)
+    return hasher.hexdigest()
+
+
+class BaseCache(ABC):
+    """Minimal string key/value cache interface with per-entry TTL."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        """Store value under key, expiring after ttl_seconds when provided."""
+
+    def close(self) -> None:
+        """Release any resources held by the cache."""
+
+
+class InMemoryCache(BaseCache):
+    """Process-local LRU cache with per-entry expiry."""
+
+    def __init__(self, default_ttl_seconds: Optional[float] = None, max_entries: int = 10000):
+        """Create an empty cache.
+
+        Args:
+            default_ttl_seconds: TTL applied when set() is called without one
+            max_entries: Maximum number of entries kept before LRU eviction
+        """
+        self.default_ttl_seconds = default_ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        """Store value under key, evicting the least recently used entries when full."""
+        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def close(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(BaseCache):
+    """Disk-backed cache stored in a single SQLite file.
+
+    Entries expire after their TTL and the table is bounded to max_entries,
+    evicting the least recently used rows first when the bound is exceeded.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        default_ttl_seconds: Optional[float] = None,
+        max_entries: int = 10000,
+    ):
+        """Open (or create) the cache database at path.
+
+        Args:
+            path: Location of the SQLite database file
+            default_ttl_seconds: TTL applied when set() is called without one
+            max_entries: Maximum number of rows kept before LRU eviction
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.default_ttl_seconds = default_ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            # Touch the row so LRU eviction keeps frequently used entries
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        """Store value under key, then evict expired and least recently used rows."""
+        now = time.time()
+        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                " SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one shared task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task instead of starting duplicate work.
+    Entries are dropped as soon as the task finishes, so only in-flight work
+    is shared and nothing is retained between calls.
+    """
+
+    def __init__(self):
+        """Initialize an empty in-flight registry."""
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, coroutine_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run coroutine_factory() once per key among concurrent callers.
+
+        Args:
+            key: Identifier of the work; callers with equal keys share one result
+            coroutine_factory: Zero-argument callable creating the coroutine to run
+
+        Returns:
+            The result of the shared task
+        """
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(coroutine_factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda finished, key=key: self._discard(key, finished))
+        # Shield so a cancelled caller does not cancel work other callers await
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Return the number of tasks currently running."""
+        return len(self._tasks)
+
+    def _discard(self, key: str, task: asyncio.Task) -> None:
+        """Remove a finished task from the registry."""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark exceptions as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,102 @@
+"""Checkpoint serializer that compresses large payloads of deep research threads."""
+
+import zlib
+from functools import lru_cache
+from typing import Any, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import StateGraph
+from langgraph.graph.state import CompiledStateGraph
+
+# Payloads smaller than this are stored uncompressed; compression gains little on them
+DEFAULT_COMPRESSION_THRESHOLD_BYTES = 16 * 1024
+
+
+@lru_cache(maxsize=1)
+def get_zstandard() -> Optional[Any]:
+    """Import the optional zstandard module, or return None if it is not installed."""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Serializer wrapper that compresses large serialized payloads.
+
+    Objects are encoded by the wrapped serializer (msgpack via JsonPlusSerializer by
+    default), then compressed with zstd, or zlib when zstandard is not installed,
+    if the encoded payload reaches the size threshold. The codec is appended to the
+    type tag (for example "msgpack+zstd") so payloads decode transparently, and
+    checkpoints written before compression was enabled still load.
+    """
+
+    def __init__(
+        self,
+        serde: Optional[SerializerProtocol] = None,
+        threshold_bytes: int = DEFAULT_COMPRESSION_THRESHOLD_BYTES,
+        level: int = 3,
+    ):
+        """Wrap a serializer.
+
+        Args:
+            serde: Serializer producing the uncompressed payloads; defaults to JsonPlusSerializer
+            threshold_bytes: Minimum encoded size at which payloads are compressed
+            level: Compression level passed to zstd or zlib
+        """
+        self.serde = serde or JsonPlusSerializer()
+        self.threshold_bytes = threshold_bytes
+        self.level = level
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        """Serialize obj, compressing the payload when it reaches the threshold."""
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) < self.threshold_bytes:
+            return type_, data
+
+        zstandard = get_zstandard()
+        if zstandard is not None:
+            return f"{type_}+zstd", zstandard.ZstdCompressor(level=self.level).compress(data)
+        return f"{type_}+zlib", zlib.compress(data, min(self.level, 9))
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        """Deserialize a payload written by dumps_typed or by the wrapped serializer."""
+        type_, payload = data
+        base_type, _, codec = type_.rpartition("+")
+        if codec == "zstd":
+            zstandard = get_zstandard()
+            if zstandard is None:
+                raise ImportError("zstandard is required to read this checkpoint: pip install zstandard")
+            return self.serde.loads_typed((base_type, zstandard.ZstdDecompressor().decompress(payload)))
+        if codec == "zlib":
+            return self.serde.loads_typed((base_type, zlib.decompress(payload)))
+        return self.serde.loads_typed(data)
+
+
+def compile_with_compressed_checkpoints(
+    builder: StateGraph,
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    threshold_bytes: int = DEFAULT_COMPRESSION_THRESHOLD_BYTES,
+    **compile_kwargs: Any,
+) -> CompiledStateGraph:
+    """Compile a graph whose checkpointer stores compressed payloads.
+
+    Args:
+        builder: Graph builder to compile, such as deep_researcher_builder
+        checkpointer: Checkpointer to use; its serializer is wrapped in place.
+            Defaults to an in-memory checkpointer
+        threshold_bytes: Minimum encoded size at which payloads are compressed
+        **compile_kwargs: Further arguments passed to builder.compile()
+
+    Returns:
+        Compiled graph using the compressing checkpointer
+    """
+    if checkpointer is None:
+        checkpointer = InMemorySaver(serde=CompressedSerializer(threshold_bytes=threshold_bytes))
+    elif not isinstance(checkpointer.serde, CompressedSerializer):
+        checkpointer.serde = CompressedSerializer(checkpointer.serde, threshold_bytes=threshold_bytes)
+    return builder.compile(checkpointer=checkpointer, **compile_kwargs)
@@ -16,6 +16,20 @@ class SearchAPI(Enum):
     TAVILY = "tavily"
     NONE = "none"
 
+class DedupScope(Enum):
+    """Scope in which concurrent identical summarization requests are shared."""
+    
+    OFF = "off"
+    RUN = "run"
+    PROCESS = "process"
+
+class SearchCacheBackend(Enum):
+    """Enumeration of storage backends for cached search responses."""
+    
+    NONE = "none"
+    MEMORY = "memory"
+    SQLITE = "sqlite"
+
 class MCPConfig(BaseModel):
     """Configuration for Model Context Protocol (MCP) servers."""
     
@@ -105,6 +119,78 @@ class Configuration(BaseModel):
             }
         }
     )
+    queue_overflow_research_units: bool = Field(
+        default=True,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": True,
+                "description": "Whether research units requested beyond max_concurrent_research_units are queued and run as slots free up within the same step, instead of being rejected back to the supervisor"
+            }
+        }
+    )
+    research_round_deadline_seconds: float = Field(
+        default=0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 0,
+                "min": 0,
+                "max": 3600,
+                "description": "Maximum seconds the supervisor waits for the research units of one round. Units still running are cancelled and their partial findings salvaged. 0 waits for every unit."
+            }
+        }
+    )
+    research_round_quorum: float = Field(
+        default=0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "slider",
+                "default": 0,
+                "min": 0,
+                "max": 1,
+                "step": 0.05,
+                "description": "Fraction of a round's research units that must finish before the supervisor continues. Remaining units are cancelled and their partial findings salvaged. 0 or 1 waits for every unit."
+            }
+        }
+    )
+    research_unit_max_retries: int = Field(
+        default=1,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 1,
+                "min": 0,
+                "max": 5,
+                "description": "Number of times a failed research unit is retried, with exponential backoff, before an error is reported to the supervisor for that unit only"
+            }
+        }
+    )
+    research_unit_retry_backoff_seconds: float = Field(
+        default=2.0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 2.0,
+                "min": 0,
+                "max": 60,
+                "description": "Delay in seconds before the first retry of a failed research unit; doubled for each further retry"
+            }
+        }
+    )
+    research_topic_dedup_threshold: float = Field(
+        default=0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "slider",
+                "default": 0,
+                "min": 0,
+                "max": 1,
+                "step": 0.05,
+                "description": "Minimum lexical similarity at which a new research topic counts as a duplicate of a topic already researched in this run or delegated in the same round, and is answered with that topic's findings instead of being researched again. Values around 0.85 catch near-verbatim repeats. 0 disables deduplication."
+            }
+        }
+    )
     max_researcher_iterations: int = Field(
         default=6,
         metadata={
@@ -131,6 +217,41 @@ class Configuration(BaseModel):
             }
         }
     )
+    researcher_time_budget_seconds: float = Field(
+        default=0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 0,
+                "min": 0,
+                "max": 3600,
+                "description": "Maximum wall-clock seconds a single researcher may spend before it compresses what it has found. Tool calls are cut off when the budget runs out. 0 disables the limit."
+            }
+        }
+    )
+    researcher_token_budget: int = Field(
+        default=0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 0,
+                "min": 0,
+                "description": "Maximum cumulative input and output tokens of a single researcher's model calls before it compresses what it has found. 0 disables the limit."
+            }
+        }
+    )
+    researcher_search_call_budget: int = Field(
+        default=0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 0,
+                "min": 0,
+                "max": 100,
+                "description": "Maximum number of search tool calls a single researcher may make before it compresses what it has found. 0 disables the limit."
+            }
+        }
+    )
     # Model Configuration
     summarization_model: str = Field(
         default="openai:gpt-4.1-mini",
@@ -164,6 +285,186 @@ class Configuration(BaseModel):
             }
         }
     )
+    search_deadline_seconds: int = Field(
+        default=0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 0,
+                "min": 0,
+                "max": 600,
+                "description": "Deadline for a single Tavily search tool call, in seconds. When it passes, sources summarized so far are returned and the rest fall back to search snippets. 0 waits for every summary."
+            }
+        }
+    )
+    max_summarized_results: int = Field(
+        default=0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 0,
+                "min": 0,
+                "max": 100,
+                "description": "Maximum number of search results summarized per Tavily search call, chosen by relevance score across all queries. The rest are returned as search snippets. 0 summarizes every result."
+            }
+        }
+    )
+    rerank_results_locally: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Blend Tavily's relevance score with a local BM25 score against the queries when choosing which results to summarize"
+            }
+        }
+    )
+    tiered_content_fetch: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Search for snippets first and download full page content only for the results selected for summarization (see max_summarized_results; when that is 0, the top 5 results are summarized)"
+            }
+        }
+    )
+    content_prefilter_enabled: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Strip boilerplate from webpages and keep only the passages most relevant to the search query before summarization"
+            }
+        }
+    )
+    prefilter_max_content_length: int = Field(
+        default=15000,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 15000,
+                "min": 1000,
+                "max": 200000,
+                "description": "Character budget for the relevant passages kept by the content pre-filter, which scores the whole page; capped at max_content_length"
+            }
+        }
+    )
+    summarization_timeout_seconds: int = Field(
+        default=60,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 60,
+                "min": 5,
+                "max": 600,
+                "description": "Maximum time to wait for a webpage summary, in seconds"
+            }
+        }
+    )
+    summarization_adaptive_timeout: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Derive the summarization timeout from recently observed model latencies instead of always waiting the maximum"
+            }
+        }
+    )
+    summarization_hedging: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Send a second summarization request when the first one is slower than the model's 90th percentile latency, and use whichever finishes first"
+            }
+        }
+    )
+    summarization_hedge_model: Optional[str] = Field(
+        default=None,
+        optional=True,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "text",
+                "description": "Model used for hedged summarization requests. Defaults to the summarization model."
+            }
+        }
+    )
+    summarization_fallback_max_chars: int = Field(
+        default=4000,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 4000,
+                "min": 500,
+                "max": 50000,
+                "description": "Maximum length of the local extractive summary used when webpage summarization times out or fails"
+            }
+        }
+    )
+    near_duplicate_detection: bool = Field(
+        default=True,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": True,
+                "description": "Collapse search results with nearly identical content (syndicated or mirrored pages) into one source before summarization"
+            }
+        }
+    )
+    near_duplicate_max_distance: int = Field(
+        default=6,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "slider",
+                "default": 6,
+                "min": 0,
+                "max": 16,
+                "step": 1,
+                "description": "Maximum number of differing SimHash bits (out of 64) for two webpages to be treated as near-duplicates"
+            }
+        }
+    )
+    summarization_batch_size: int = Field(
+        default=1,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "slider",
+                "default": 1,
+                "min": 1,
+                "max": 10,
+                "step": 1,
+                "description": "Maximum number of short webpages summarized together in a single model call. 1 summarizes every webpage separately."
+            }
+        }
+    )
+    summarization_batch_page_max_chars: int = Field(
+        default=3000,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 3000,
+                "min": 100,
+                "max": 20000,
+                "description": "Webpages up to this many characters are eligible for batched summarization"
+            }
+        }
+    )
+    summarization_skip_below_chars: int = Field(
+        default=0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 0,
+                "min": 0,
+                "max": 5000,
+                "description": "Webpages shorter than this many characters are passed through without summarization. 0 summarizes every webpage."
+            }
+        }
+    )
     research_model: str = Field(
         default="openai:gpt-4.1",
         metadata={
@@ -204,6 +505,16 @@ class Configuration(BaseModel):
             }
         }
     )
+    map_reduce_compression: bool = Field(
+        default=True,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": True,
+                "description": "Whether to compress researcher transcripts that exceed the compression model's context window in parallel chunks and merge the results, instead of dropping the oldest tool calls"
+            }
+        }
+    )
     final_report_model: str = Field(
         default="openai:gpt-4.1",
         metadata={
@@ -224,6 +535,214 @@ class Configuration(BaseModel):
             }
         }
     )
+    context_window_safety_margin: float = Field(
+        default=0.1,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "slider",
+                "default": 0.1,
+                "min": 0.0,
+                "max": 0.5,
+                "step": 0.05,
+                "description": "Fraction of each model's context window held back when fitting prompts to the window before calling the model, to absorb token estimation error and tool definitions"
+            }
+        }
+    )
+    researcher_compaction_threshold: float = Field(
+        default=0.0,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "slider",
+                "default": 0.0,
+                "min": 0.0,
+                "max": 1.0,
+                "step": 0.05,
+                "description": "Fraction of the research model's context window at which older tool results in a researcher's transcript are replaced by extractive summaries before the next model call. 0 disables compaction."
+            }
+        }
+    )
+    researcher_compaction_keep_recent_turns: int = Field(
+        default=2,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 2,
+                "min": 0,
+                "max": 10,
+                "description": "Number of most recent researcher tool-calling turns whose results are never compacted"
+            }
+        }
+    )
+    researcher_compaction_max_chars: int = Field(
+        default=2000,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 2000,
+                "min": 200,
+                "max": 20000,
+                "description": "Maximum length in characters of each compacted tool result"
+            }
+        }
+    )
+    supervisor_rolling_summary: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Whether to condense earlier supervisor research rounds into a rolling progress digest, so the supervisor prompt only carries the digest and the latest rounds. Full findings are still used for the final report."
+            }
+        }
+    )
+    supervisor_summary_keep_rounds: int = Field(
+        default=1,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 1,
+                "min": 1,
+                "max": 5,
+                "description": "Number of most recent supervisor rounds kept verbatim when rolling summarization is enabled"
+            }
+        }
+    )
+    # Cache Configuration
+    prompt_caching: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Whether to lay out prompts for provider prompt-prefix caching and mark cache breakpoints on Anthropic models. Cache hit tokens are logged per call."
+            }
+        }
+    )
+    summary_cache_enabled: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Whether to cache webpage summaries on disk and reuse them across researchers and runs"
+            }
+        }
+    )
+    summary_cache_path: Optional[str] = Field(
+        default=None,
+        optional=True,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "text",
+                "description": "Path of the SQLite file used for the summary cache. Defaults to .cache/summaries.sqlite in the project root."
+            }
+        }
+    )
+    summary_cache_ttl_seconds: int = Field(
+        default=604800,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 604800,
+                "min": 60,
+                "description": "How long a cached webpage summary stays valid, in seconds"
+            }
+        }
+    )
+    summary_cache_max_entries: int = Field(
+        default=10000,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 10000,
+                "min": 100,
+                "description": "Maximum number of cached webpage summaries before least recently used entries are evicted"
+            }
+        }
+    )
+    summarization_dedup_scope: DedupScope = Field(
+        default=DedupScope.RUN,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "select",
+                "default": "run",
+                "description": "Share in-flight summarizations of the same page between parallel researchers. 'run' shares within a thread, 'process' across all threads in the server.",
+                "options": [
+                    {"label": "Run", "value": DedupScope.RUN.value},
+                    {"label": "Process", "value": DedupScope.PROCESS.value},
+                    {"label": "Off", "value": DedupScope.OFF.value}
+                ]
+            }
+        }
+    )
+    search_cache_backend: SearchCacheBackend = Field(
+        default=SearchCacheBackend.NONE,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "select",
+                "default": "none",
+                "description": "Where to cache Tavily search responses so repeated queries skip the search API. 'sqlite' shares the cache across restarts.",
+                "options": [
+                    {"label": "None", "value": SearchCacheBackend.NONE.value},
+                    {"label": "In-Memory", "value": SearchCacheBackend.MEMORY.value},
+                    {"label": "SQLite", "value": SearchCacheBackend.SQLITE.value}
+                ]
+            }
+        }
+    )
+    search_cache_general_ttl_seconds: int = Field(
+        default=86400,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 86400,
+                "min": 60,
+                "description": "How long cached search responses for the 'general' topic stay fresh, in seconds"
+            }
+        }
+    )
+    search_cache_news_ttl_seconds: int = Field(
+        default=900,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 900,
+                "min": 60,
+                "description": "How long cached search responses for the 'news' and 'finance' topics stay fresh, in seconds"
+            }
+        }
+    )
+    blob_store_enabled: bool = Field(
+        default=False,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "boolean",
+                "default": False,
+                "description": "Whether to store raw notes and oversized researcher tool outputs in a content-addressed blob store, keeping only blob:// references in graph state and checkpoints"
+            }
+        }
+    )
+    blob_store_path: Optional[str] = Field(
+        default=None,
+        optional=True,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "text",
+                "description": "Directory of the blob store. Defaults to .cache/blobs in the project root."
+            }
+        }
+    )
+    blob_store_threshold_chars: int = Field(
+        default=20000,
+        metadata={
+            "x_oap_ui_config": {
+                "type": "number",
+                "default": 20000,
+                "min": 0,
+                "description": "Minimum length in characters of a raw note or tool output before it is moved to the blob store"
+            }
+        }
+    )
     # MCP server configuration
     mcp_config: Optional[MCPConfig] = Field(
         default=None,
@@ -2,9 +2,10 @@
 
 import asyncio
 import logging
+import math
+import time
 from typing import Literal
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     AIMessage,
     HumanMessage,
@@ -22,12 +23,15 @@ from open_deep_research.configuration import (
 )
 from open_deep_research.prompts import (
     clarify_with_user_instructions,
+    compress_research_merge_prompt,
     compress_research_simple_human_message,
     compress_research_system_prompt,
     final_report_generation_prompt,
     lead_researcher_prompt,
     research_system_prompt,
     structure_report_mdx_prompt,
+    supervisor_digest_human_message,
+    supervisor_digest_prompt,
     transform_messages_into_research_topic_prompt,
 )
 from open_deep_research.bluf_writer import bluf_writer
@@ -43,27 +47,43 @@ from open_deep_research.state import (
     ResearchQuestion,
     SupervisorState,
 )
+from open_deep_research.text_utils import extractive_summary
+from open_deep_research.token_budget import (
+    compact_tool_messages,
+    count_message_tokens,
+    count_tokens,
+    fit_messages_to_budget,
+    get_model_capabilities,
+    pack_turns_into_chunks,
+    split_into_turns,
+    truncate_to_token_budget,
+)
 from open_deep_research.utils import (
+    Deadline,
+    add_cache_breakpoints,
     anthropic_websearch_called,
+    deduplicate_research_calls,
+    format_supervisor_rounds,
+    gather_until_deadline,
     generate_mcp_tool_description,
     generate_rag_tool_description,
     get_all_tools,
     get_api_key_for_model,
-    get_model_token_limit,
+    get_blob_store,
+    get_configured_model,
     get_notes_from_tool_calls,
     get_today_str,
     is_token_limit_exceeded,
+    log_prompt_cache_usage,
+    offload_to_blob_store,
     openai_websearch_called,
     remove_up_to_last_ai_message,
+    resolve_blob_messages,
     save_consolidated_report,
+    split_supervisor_rounds,
     think_tool,
 )
 
-# Initialize a configurable model that we will use throughout the agent
-configurable_model = init_chat_model(
-    configurable_fields=("model", "max_tokens", "api_key"),
-)
-
 async def clarify_with_user(state: AgentState, config: RunnableConfig) -> Command[Literal["write_research_brief", "__end__"]]:
     """Analyze user messages and ask clarifying questions if the research scope is unclear.
     
@@ -93,11 +113,10 @@ async def clarify_with_user(state: AgentState, config: RunnableConfig) -> Comman
     }
     
     # Configure model with structured output and retry logic
-    clarification_model = (
-        configurable_model
-        .with_structured_output(ClarifyWithUser)
-        .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
-        .with_config(model_config)
+    clarification_model = get_configured_model(
+        model_config,
+        output_schema=ClarifyWithUser,
+        max_retries=configurable.max_structured_output_retries
     )
     
     # Step 3: Analyze whether clarification is needed
@@ -146,11 +165,10 @@ async def write_research_brief(state: AgentState, config: RunnableConfig) -> Com
     }
     
     # Configure model for structured research question generation
-    research_model = (
-        configurable_model
-        .with_structured_output(ResearchQuestion)
-        .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
-        .with_config(research_model_config)
+    research_model = get_configured_model(
+        research_model_config,
+        output_schema=ResearchQuestion,
+        max_retries=configurable.max_structured_output_retries
     )
     
     # Step 2: Generate structured research brief from user messages
@@ -209,26 +227,89 @@ async def supervisor(state: SupervisorState, config: RunnableConfig) -> Command[
     lead_researcher_tools = [ConductResearch, ResearchComplete, think_tool]
     
     # Configure model with tools, retry logic, and model settings
-    research_model = (
-        configurable_model
-        .bind_tools(lead_researcher_tools)
-        .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
-        .with_config(research_model_config)
+    research_model = get_configured_model(
+        research_model_config,
+        tools=lead_researcher_tools,
+        max_retries=configurable.max_structured_output_retries
     )
     
     # Step 2: Generate supervisor response based on current context
     supervisor_messages = state.get("supervisor_messages", [])
+    digest_update = {}
+    if configurable.supervisor_rolling_summary:
+        supervisor_messages, digest_update = await get_supervisor_context(state, configurable, config)
+    if configurable.prompt_caching:
+        supervisor_messages = add_cache_breakpoints(supervisor_messages, configurable.research_model)
     response = await research_model.ainvoke(supervisor_messages)
+    if configurable.prompt_caching:
+        log_prompt_cache_usage("supervisor", response)
     
     # Step 3: Update state and proceed to tool execution
     return Command(
         goto="supervisor_tools",
         update={
             "supervisor_messages": [response],
-            "research_iterations": state.get("research_iterations", 0) + 1
+            "research_iterations": state.get("research_iterations", 0) + 1,
+            **digest_update
         }
     )
 
+async def get_supervisor_context(state: SupervisorState, configurable: Configuration, config: RunnableConfig):
+    """Build the supervisor's view of the conversation with earlier rounds condensed into a digest.
+    
+    Rounds older than the most recent supervisor_summary_keep_rounds are folded into
+    a rolling digest with the summarization model, so each round is summarized once.
+    The full supervisor_messages are left untouched in state for note extraction.
+    
+    Args:
+        state: Current supervisor state
+        configurable: Parsed configuration
+        config: Runtime configuration for the summarization model call
+        
+    Returns:
+        Messages to send to the supervisor model, and state updates recording the digest
+    """
+    supervisor_messages = state.get("supervisor_messages", [])
+    context_messages, rounds = split_supervisor_rounds(supervisor_messages)
+    digest = state.get("supervisor_digest")
+    digested_round_count = state.get("digested_round_count", 0)
+    new_rounds = rounds[digested_round_count:max(len(rounds) - configurable.supervisor_summary_keep_rounds, 0)]
+    
+    digest_update = {}
+    if new_rounds:
+        digest_model = get_configured_model({
+            "model": configurable.summarization_model,
+            "max_tokens": configurable.summarization_model_max_tokens,
+            "api_key": get_api_key_for_model(configurable.summarization_model, config),
+            "tags": ["langsmith:nostream"]
+        })
+        prompt_content = supervisor_digest_prompt.format(
+            research_brief=state.get("research_brief", ""),
+            previous_digest=digest or "No research rounds have been digested yet.",
+            new_rounds=format_supervisor_rounds(new_rounds, first_round_number=digested_round_count + 1),
+            date=get_today_str()
+        )
+        try:
+            response = await digest_model.ainvoke([HumanMessage(content=prompt_content)])
+            digest = str(response.content)
+            digested_round_count += len(new_rounds)
+            digest_update = {
+                "supervisor_digest": digest,
+                "digested_round_count": digested_round_count
+            }
+        except Exception as e:
+            # Keep the previous digest; the undigested rounds are sent verbatim instead
+            logging.warning(f"Supervisor digest update failed with error: {str(e)}, sending rounds verbatim")
+    
+    if not digest:
+        return supervisor_messages, digest_update
+    
+    recent_messages = [message for round_messages in rounds[digested_round_count:] for message in round_messages]
+    return (
+        context_messages + [HumanMessage(content=supervisor_digest_human_message.format(digest=digest))] + recent_messages,
+        digest_update
+    )
+
 async def supervisor_tools(state: SupervisorState, config: RunnableConfig) -> Command[Literal["supervisor", "__end__"]]:
     """Execute tools called by the supervisor, including research delegation and strategic thinking.
     
@@ -292,61 +373,174 @@ async def supervisor_tools(state: SupervisorState, config: RunnableConfig) -> Co
         if tool_call["name"] == "ConductResearch"
     ]
     
+    # Answer topics that closely match research already done or delegated in this run
+    # with that research's findings instead of spawning another researcher
+    round_duplicates = []
+    if configurable.research_topic_dedup_threshold > 0 and conduct_research_calls:
+        conduct_research_calls, reused_tool_messages, round_duplicates = deduplicate_research_calls(
+            conduct_research_calls, 
+            supervisor_messages[:-1], 
+            configurable.research_topic_dedup_threshold
+        )
+        all_tool_messages.extend(reused_tool_messages)
+    
     if conduct_research_calls:
-        try:
-            # Limit concurrent research units to prevent resource exhaustion
+        # Limit concurrent research units to prevent resource exhaustion; when queueing
+        # is enabled, units beyond the limit wait for a free slot instead of being rejected
+        if configurable.queue_overflow_research_units:
+            allowed_conduct_research_calls = conduct_research_calls
+            overflow_conduct_research_calls = []
+        else:
             allowed_conduct_research_calls = conduct_research_calls[:configurable.max_concurrent_research_units]
             overflow_conduct_research_calls = conduct_research_calls[configurable.max_concurrent_research_units:]
-            
-            # Execute research tasks in parallel
-            research_tasks = [
-                researcher_subgraph.ainvoke({
+        research_unit_slots = asyncio.Semaphore(configurable.max_concurrent_research_units)
+        
+        # Early-continue mode ends the round at a deadline or quorum instead of waiting for every unit
+        early_continue = (
+            configurable.research_round_deadline_seconds > 0 or 
+            0 < configurable.research_round_quorum < 1
+        )
+        latest_researcher_states = {}
+        research_unit_errors = {}
+        
+        async def attempt_research_unit(tool_call):
+            async with research_unit_slots:
+                researcher_input = {
                     "researcher_messages": [
                         HumanMessage(content=tool_call["args"]["research_topic"])
                     ],
                     "research_topic": tool_call["args"]["research_topic"]
-                }, config) 
-                for tool_call in allowed_conduct_research_calls
-            ]
-            
-            tool_results = await asyncio.gather(*research_tasks)
-            
-            # Create tool messages with research results
-            for observation, tool_call in zip(tool_results, allowed_conduct_research_calls):
-                all_tool_messages.append(ToolMessage(
-                    content=observation.get("compressed_research", "Error synthesizing research report: Maximum retries exceeded"),
-                    name=tool_call["name"],
-                    tool_call_id=tool_call["id"]
-                ))
+                }
+                if not early_continue:
+                    return await researcher_subgraph.ainvoke(researcher_input, config)
+                
+                # Track each state snapshot so a cancelled unit's partial work can be salvaged
+                researcher_state = {}
+                async for researcher_state in researcher_subgraph.astream(
+                    researcher_input, config, stream_mode="values"
+                ):
+                    latest_researcher_states[tool_call["id"]] = researcher_state
+                return {
+                    key: researcher_state[key] 
+                    for key in ("compressed_research", "raw_notes") if key in researcher_state
+                }
+        
+        async def run_research_unit(tool_call):
+            # Retry transient failures with exponential backoff, releasing the slot while waiting
+            for attempt in range(configurable.research_unit_max_retries + 1):
+                try:
+                    return await attempt_research_unit(tool_call)
+                except Exception as e:
+                    if attempt == configurable.research_unit_max_retries or is_token_limit_exceeded(e, configurable.research_model):
+                        research_unit_errors[tool_call["id"]] = e
+                        raise
+                    delay = configurable.research_unit_retry_backoff_seconds * 2 ** attempt
+                    logging.warning(f"Research unit failed with error: {str(e)}, retrying in {delay:.1f} seconds")
+                    await asyncio.sleep(delay)
+        
+        async def run_research_units(tool_calls):
+            # Execute research tasks in parallel, at most max_concurrent_research_units at a time
+            research_tasks = [run_research_unit(tool_call) for tool_call in tool_calls]
             
-            # Handle overflow research calls with error messages
-            for overflow_call in overflow_conduct_research_calls:
+            if early_continue:
+                round_deadline = Deadline(configurable.research_round_deadline_seconds or None)
+                quorum = (
+                    math.ceil(configurable.research_round_quorum * len(research_tasks))
+                    if 0 < configurable.research_round_quorum < 1 else None
+                )
+                tool_results = await gather_until_deadline(research_tasks, round_deadline, min_completed=quorum)
+                return [
+                    observation if observation is not None 
+                    else research_unit_errors.get(tool_call["id"]) or salvage_partial_research(
+                        latest_researcher_states.get(tool_call["id"]),
+                        configurable
+                    )
+                    for observation, tool_call in zip(tool_results, tool_calls)
+                ]
+            # Failed units come back as exceptions so they do not discard the other units' work
+            return await asyncio.gather(*research_tasks, return_exceptions=True)
+        
+        tool_results = await run_research_units(allowed_conduct_research_calls)
+        
+        # End the research phase only when every unit overflowed the model's context window
+        failed_results = [observation for observation in tool_results if isinstance(observation, Exception)]
+        if failed_results and len(failed_results) == len(tool_results) and all(
+            is_token_limit_exceeded(observation, configurable.research_model) 
+            for observation in failed_results
+        ):
+            return Command(
+                goto=END,
+                update={
+                    "notes": get_notes_from_tool_calls(supervisor_messages),
+                    "research_brief": state.get("research_brief", "")
+                }
+            )
+        
+        # Hand same-round duplicates the result of the unit they matched; a duplicate
+        # of a unit that failed is researched itself, and one of an overflow call is rejected too
+        results_by_call_id = {
+            tool_call["id"]: observation 
+            for observation, tool_call in zip(tool_results, allowed_conduct_research_calls)
+        }
+        rerun_calls = []
+        for duplicate_call, kept_call in round_duplicates:
+            observation = results_by_call_id.get(kept_call["id"])
+            if kept_call in overflow_conduct_research_calls:
+                overflow_conduct_research_calls.append(duplicate_call)
+            elif isinstance(observation, Exception):
+                rerun_calls.append(duplicate_call)
+            else:
                 all_tool_messages.append(ToolMessage(
-                    content=f"Error: Did not run this research as you have already exceeded the maximum number of concurrent research units. Please try again with {configurable.max_concurrent_research_units} or fewer research units.",
+                    content=(
+                        "This topic closely matches another topic delegated in this round: "
+                        f"\"{kept_call['args']['research_topic']}\". Findings from that research:\n\n"
+                        f"{observation.get('compressed_research', 'Error synthesizing research report: Maximum retries exceeded')}"
+                    ),
                     name="ConductResearch",
-                    tool_call_id=overflow_call["id"]
+                    tool_call_id=duplicate_call["id"],
+                    additional_kwargs={"reused_research_from": kept_call["id"]}
                 ))
-            
-            # Aggregate raw notes from all research results
-            raw_notes_concat = "\n".join([
-                "\n".join(observation.get("raw_notes", [])) 
-                for observation in tool_results
-            ])
+        if rerun_calls:
+            tool_results = list(tool_results) + list(await run_research_units(rerun_calls))
+        executed_conduct_research_calls = allowed_conduct_research_calls + rerun_calls
+        
+        # Create tool messages with research results, and error messages for failed units
+        raw_notes = []
+        for observation, tool_call in zip(tool_results, executed_conduct_research_calls):
+            if isinstance(observation, Exception):
+                logging.warning(f"Research unit failed with error: {str(observation)}")
+                content = f"Error: Research on this topic failed with error: {str(observation)}. The other research units' findings are unaffected."
+                partial_state = latest_researcher_states.get(tool_call["id"])
+                if partial_state:
+                    raw_notes.extend(salvage_partial_research(partial_state, configurable)["raw_notes"])
+            else:
+                content = observation.get("compressed_research", "Error synthesizing research report: Maximum retries exceeded")
+                raw_notes.extend(observation.get("raw_notes", []))
+            all_tool_messages.append(ToolMessage(
+                content=content,
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"]
+            ))
+        
+        # Handle overflow research calls with error messages
+        for overflow_call in overflow_conduct_research_calls:
+            all_tool_messages.append(ToolMessage(
+                content=f"Error: Did not run this research as you have already exceeded the maximum number of concurrent research units. Please try again with {configurable.max_concurrent_research_units} or fewer research units.",
+                name="ConductResearch",
+                tool_call_id=overflow_call["id"]
+            ))
+        
+        # Aggregate raw notes from all research results; blob references are kept as
+        # separate entries since concatenating them would require loading every blob
+        if get_blob_store(configurable) is not None:
+            raw_notes = [raw_note for raw_note in raw_notes if raw_note]
+            if raw_notes:
+                update_payload["raw_notes"] = raw_notes
+        else:
+            raw_notes_concat = "\n".join(raw_notes)
             
             if raw_notes_concat:
                 update_payload["raw_notes"] = [raw_notes_concat]
-                
-        except Exception as e:
-            # Handle research execution errors
-            if is_token_limit_exceeded(e, configurable.research_model) or True:
-                # Token limit exceeded or other error - end research phase
-                return Command(
-                    goto=END,
-                    update={
-                        "notes": get_notes_from_tool_calls(supervisor_messages),
-                        "research_brief": state.get("research_brief", "")
-                    }
-                )
     
     # Step 3: Return command with all tool results
     update_payload["supervisor_messages"] = all_tool_messages
@@ -369,7 +563,22 @@ supervisor_builder.add_edge(START, "supervisor")  # Entry point to supervisor
 # Compile supervisor subgraph for use in main workflow
 supervisor_subgraph = supervisor_builder.compile()
 
-async def researcher(state: ResearcherState, config: RunnableConfig) -> Command[Literal["researcher_tools"]]:
+def get_exhausted_researcher_budget(
+    configurable: Configuration, 
+    started_at: float, 
+    tokens_used: int, 
+    search_calls: int
+):
+    """Return a description of the first exhausted per-researcher budget, or None if all remain."""
+    if configurable.researcher_time_budget_seconds and time.time() - started_at >= configurable.researcher_time_budget_seconds:
+        return f"time budget of {configurable.researcher_time_budget_seconds} seconds"
+    if configurable.researcher_token_budget and tokens_used >= configurable.researcher_token_budget:
+        return f"token budget of {configurable.researcher_token_budget} tokens"
+    if configurable.researcher_search_call_budget and search_calls >= configurable.researcher_search_call_budget:
+        return f"search call budget of {configurable.researcher_search_call_budget} calls"
+    return None
+
+async def researcher(state: ResearcherState, config: RunnableConfig) -> Command[Literal["researcher_tools", "compress_research"]]:
     """Individual researcher that conducts focused research on specific topics.
     
     This researcher is given a specific research topic by the supervisor and uses
@@ -381,11 +590,25 @@ async def researcher(state: ResearcherState, config: RunnableConfig) -> Command[
         config: Runtime configuration with model settings and tool availability
         
     Returns:
-        Command to proceed to researcher_tools for tool execution
+        Command to proceed to researcher_tools for tool execution, or to compress_research
+        once a per-researcher budget is exhausted
     """
-    # Step 1: Load configuration and validate tool availability
+    # Step 1: Load configuration, check budgets and validate tool availability
     configurable = Configuration.from_runnable_config(config)
-    researcher_messages = state.get("researcher_messages", [])
+    stored_messages = state.get("researcher_messages", [])
+    
+    # Resolve tool outputs that were moved to the blob store
+    researcher_messages = resolve_blob_messages(stored_messages, get_blob_store(configurable))
+    
+    # Stop researching with what has been found once a per-researcher budget is used up
+    started_at = state.get("started_at") or time.time()
+    tokens_used = state.get("tokens_used", 0)
+    exhausted_budget = get_exhausted_researcher_budget(
+        configurable, started_at, tokens_used, state.get("search_calls", 0)
+    )
+    if exhausted_budget:
+        logging.info(f"Researcher exhausted its {exhausted_budget}, compressing findings")
+        return Command(goto="compress_research")
     
     # Get all available research tools (search, MCP, think_tool, RAG)
     tools = await get_all_tools(config)
@@ -454,25 +677,65 @@ async def researcher(state: ResearcherState, config: RunnableConfig) -> Command[
     )
     
     # Configure model with tools, retry logic, and settings
-    research_model = (
-        configurable_model
-        .bind_tools(tools)
-        .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
-        .with_config(research_model_config)
+    research_model = get_configured_model(
+        research_model_config,
+        tools=tools,
+        max_retries=configurable.max_structured_output_retries
     )
     
     # Step 3: Generate researcher response with system context
     messages = [SystemMessage(content=researcher_prompt)] + researcher_messages
+    
+    research_budget = get_model_capabilities(
+        configurable.research_model, configurable.research_model_max_tokens
+    ).input_budget(configurable.context_window_safety_margin)
+    
+    # Compact older tool results once the transcript passes the configured share of the window
+    compacted_originals = []
+    compaction_threshold = configurable.researcher_compaction_threshold
+    if (
+        compaction_threshold > 0 and research_budget is not None and
+        count_message_tokens(messages, configurable.research_model) > compaction_threshold * research_budget
+    ):
+        compacted_messages, compacted_originals = compact_tool_messages(
+            researcher_messages,
+            keep_recent_turns=configurable.researcher_compaction_keep_recent_turns,
+            max_chars=configurable.researcher_compaction_max_chars
+        )
+        # Messages left unchanged keep their stored form, so blob references stay offloaded
+        stored_messages = [
+            stored if compacted is resolved else compacted
+            for stored, resolved, compacted in zip(stored_messages, researcher_messages, compacted_messages)
+        ]
+        researcher_messages = compacted_messages
+        messages = [SystemMessage(content=researcher_prompt)] + researcher_messages
+    
+    # Fit the transcript to the context window before calling instead of failing on overflow
+    messages = fit_messages_to_budget(messages, configurable.research_model, research_budget)
+    if configurable.prompt_caching:
+        messages = add_cache_breakpoints(messages, configurable.research_model)
     response = await research_model.ainvoke(messages)
+    if configurable.prompt_caching:
+        log_prompt_cache_usage("researcher", response)
     
     # Step 4: Update state and proceed to tool execution
-    return Command(
-        goto="researcher_tools",
-        update={
-            "researcher_messages": [response],
-            "tool_call_iterations": state.get("tool_call_iterations", 0) + 1
-        }
-    )
+    usage = getattr(response, "usage_metadata", None) or {}
+    update = {
+        "researcher_messages": [response],
+        "tool_call_iterations": state.get("tool_call_iterations", 0) + 1,
+        "started_at": started_at,
+        "tokens_used": tokens_used + usage.get("total_tokens", 0)
+    }
+    if compacted_originals:
+        # Persist the compacted transcript and keep the full tool outputs in the raw notes
+        update["researcher_messages"] = {"type": "override", "value": stored_messages + [response]}
+        update["raw_notes"] = [
+            offload_to_blob_store(original, configurable) for original in compacted_originals
+        ]
+    return Command(goto="researcher_tools", update=update)
+
+# Tools whose calls count against the researcher's search call budget
+SEARCH_TOOL_NAMES = {"tavily_search", "web_search"}
 
 # Tool Execution Helper Function
 async def execute_tool_safely(tool, args, config):
@@ -522,18 +785,30 @@ async def researcher_tools(state: ResearcherState, config: RunnableConfig) -> Co
         for tool in tools
     }
     
-    # Execute all tool calls in parallel
+    # Execute all tool calls in parallel, bounded by the researcher's remaining time budget
     tool_calls = most_recent_message.tool_calls
     tool_execution_tasks = [
         execute_tool_safely(tools_by_name[tool_call["name"]], tool_call["args"], config) 
         for tool_call in tool_calls
     ]
-    observations = await asyncio.gather(*tool_execution_tasks)
+    started_at = state.get("started_at") or time.time()
+    remaining_seconds = None
+    if configurable.researcher_time_budget_seconds:
+        remaining_seconds = max(configurable.researcher_time_budget_seconds - (time.time() - started_at), 0)
+    observations = await gather_until_deadline(tool_execution_tasks, Deadline(remaining_seconds))
+    observations = [
+        observation if observation is not None 
+        else "Error executing tool: the researcher's time budget ran out before the tool finished"
+        for observation in observations
+    ]
+    search_calls = state.get("search_calls", 0) + sum(
+        1 for tool_call in tool_calls if tool_call["name"] in SEARCH_TOOL_NAMES
+    ) + int(has_native_search)
     
-    # Create tool messages from execution results
+    # Create tool messages from execution results, moving oversized outputs to the blob store
     tool_outputs = [
         ToolMessage(
-            content=observation,
+            content=offload_to_blob_store(observation, configurable),
             name=tool_call["name"],
             tool_call_id=tool_call["id"]
         ) 
@@ -547,18 +822,157 @@ async def researcher_tools(state: ResearcherState, config: RunnableConfig) -> Co
         for tool_call in most_recent_message.tool_calls
     )
     
-    if exceeded_iterations or research_complete_called:
+    exhausted_budget = get_exhausted_researcher_budget(
+        configurable, started_at, state.get("tokens_used", 0), search_calls
+    )
+    
+    if exceeded_iterations or research_complete_called or exhausted_budget:
         # End research and proceed to compression
+        if exhausted_budget:
+            logging.info(f"Researcher exhausted its {exhausted_budget}, compressing findings")
         return Command(
             goto="compress_research",
-            update={"researcher_messages": tool_outputs}
+            update={"researcher_messages": tool_outputs, "search_calls": search_calls}
         )
     
     # Continue research loop with tool results
     return Command(
         goto="researcher",
-        update={"researcher_messages": tool_outputs}
+        update={"researcher_messages": tool_outputs, "search_calls": search_calls}
+    )
+
+def get_raw_notes_content(researcher_messages):
+    """Join the tool and AI message contents of a transcript, skipping compacted tool results.
+    
+    The original contents of compacted tool results were already added to raw_notes
+    when they were compacted.
+    """
+    return "\n".join([
+        str(message.content) 
+        for message in filter_messages(researcher_messages, include_types=["tool", "ai"])
+        if not message.additional_kwargs.get("compacted")
+    ])
+
+def salvage_partial_research(researcher_state, configurable: Configuration):
+    """Build a researcher result from the last state of a unit stopped before it finished.
+    
+    Args:
+        researcher_state: Last state snapshot of the researcher subgraph, or None if it never started
+        configurable: Configuration with the extractive summary bound and blob store settings
+        
+    Returns:
+        Dictionary shaped like the researcher subgraph output
+    """
+    if not researcher_state:
+        return {
+            "compressed_research": "Research on this topic was not started before the round ended.",
+            "raw_notes": []
+        }
+    
+    researcher_messages = resolve_blob_messages(
+        researcher_state.get("researcher_messages", []), get_blob_store(configurable)
+    )
+    partial_findings = "\n\n".join(
+        str(message.content) 
+        for message in filter_messages(researcher_messages, include_types=["tool"])
     )
+    if not partial_findings:
+        return {
+            "compressed_research": "Research on this topic was stopped before it finished. No findings were gathered before the round ended.",
+            "raw_notes": researcher_state.get("raw_notes", [])
+        }
+    return {
+        "compressed_research": (
+            "Research on this topic was stopped before it finished. Partial findings:\n"
+            f"{extractive_summary(partial_findings, configurable.summarization_fallback_max_chars)}"
+        ),
+        "raw_notes": researcher_state.get("raw_notes", []) + [
+            offload_to_blob_store(get_raw_notes_content(researcher_messages), configurable)
+        ]
+    }
+
+async def map_reduce_compress_research(
+    researcher_messages, 
+    research_topic: str, 
+    synthesizer_model, 
+    configurable: Configuration, 
+    compression_budget: int
+) -> str:
+    """Compress a transcript too large for one compression call in parallel chunks.
+    
+    The transcript is split into chunks of whole tool-calling turns that each fit the
+    compression model's window, the chunks are compressed concurrently with the
+    regular compression prompt, and the partial findings are merged, in several
+    levels if needed, so no tool result is dropped.
+    
+    Args:
+        researcher_messages: Transcript ending with the compression instruction
+        research_topic: Topic the researcher was assigned
+        synthesizer_model: Configured compression model
+        configurable: Configuration with the compression model settings
+        compression_budget: Prompt token budget of the compression model
+        
+    Returns:
+        Merged compressed research findings
+    """
+    model_name = configurable.compression_model
+    system_message = SystemMessage(content=compress_research_system_prompt.format(date=get_today_str()))
+    head, turns, tail = split_into_turns(researcher_messages)
+    
+    # Step 1: Map - compress chunks of turns that fit beside the instructions in parallel
+    chunk_budget = compression_budget - count_message_tokens([system_message] + head + tail, model_name)
+    chunks = pack_turns_into_chunks(turns, model_name, max(chunk_budget, 1))
+    
+    async def compress_chunk(chunk):
+        messages = fit_messages_to_budget(
+            [system_message] + head + chunk + tail, model_name, compression_budget
+        )
+        try:
+            response = await synthesizer_model.ainvoke(messages)
+            return str(response.content)
+        except Exception as e:
+            logging.warning(f"Compressing a transcript chunk failed, using an extractive summary instead: {str(e)}")
+            return extractive_summary(get_raw_notes_content(chunk), configurable.summarization_fallback_max_chars)
+    
+    partial_findings = await asyncio.gather(*[compress_chunk(chunk) for chunk in chunks])
+    logging.info(f"Compressed an oversized researcher transcript in {len(chunks)} chunks")
+    
+    # Step 2: Reduce - merge groups of partial findings until a single report remains
+    def build_merge_prompt(parts):
+        return compress_research_merge_prompt.format(
+            research_topic=research_topic,
+            partial_findings="\n\n".join(
+                f"<Part {index}>\n{part}\n</Part {index}>" for index, part in enumerate(parts, 1)
+            ),
+            date=get_today_str()
+        )
+    
+    async def merge_parts(parts):
+        if len(parts) == 1:
+            return parts[0]
+        try:
+            response = await synthesizer_model.ainvoke([HumanMessage(content=build_merge_prompt(parts))])
+            return str(response.content)
+        except Exception as e:
+            logging.warning(f"Merging partial research findings failed, joining them instead: {str(e)}")
+            return "\n\n".join(parts)
+    
+    merge_budget = compression_budget - count_tokens(build_merge_prompt([]), model_name)
+    while len(partial_findings) > 1:
+        # Group consecutive parts under the budget, at least two per group so each level shrinks
+        groups = []
+        group_tokens = 0
+        for part in partial_findings:
+            part_tokens = count_tokens(part, model_name)
+            if groups and (len(groups[-1]) < 2 or group_tokens + part_tokens <= merge_budget):
+                groups[-1].append(part)
+                group_tokens += part_tokens
+            else:
+                groups.append([part])
+                group_tokens = part_tokens
+        partial_findings = await asyncio.gather(*[merge_parts(group) for group in groups])
+    
+    return partial_findings[0] if partial_findings else ""
 
 async def compress_research(state: ResearcherState, config: RunnableConfig):
     """Compress and synthesize research findings into a concise, structured summary.
@@ -576,20 +990,45 @@ async def compress_research(state: ResearcherState, config: RunnableConfig):
     """
     # Step 1: Configure the compression model
     configurable = Configuration.from_runnable_config(config)
-    synthesizer_model = configurable_model.with_config({
+    synthesizer_model = get_configured_model({
         "model": configurable.compression_model,
         "max_tokens": configurable.compression_model_max_tokens,
         "api_key": get_api_key_for_model(configurable.compression_model, config),
         "tags": ["langsmith:nostream"]
     })
     
-    # Step 2: Prepare messages for compression
-    researcher_messages = state.get("researcher_messages", [])
+    # Step 2: Prepare messages for compression, resolving offloaded tool outputs
+    researcher_messages = resolve_blob_messages(
+        state.get("researcher_messages", []), get_blob_store(configurable)
+    )
     
     # Add instruction to switch from research mode to compression mode
     researcher_messages.append(HumanMessage(content=compress_research_simple_human_message))
     
-    # Step 3: Attempt compression with retry logic for token limit issues
+    # Step 3: Map-reduce transcripts too large for a single compression call
+    compression_budget = get_model_capabilities(
+        configurable.compression_model, configurable.compression_model_max_tokens
+    ).input_budget(configurable.context_window_safety_margin)
+    
+    if configurable.map_reduce_compression and compression_budget is not None:
+        compression_prompt = compress_research_system_prompt.format(date=get_today_str())
+        transcript_tokens = count_message_tokens(
+            [SystemMessage(content=compression_prompt)] + researcher_messages, configurable.compression_model
+        )
+        if transcript_tokens > compression_budget:
+            compressed_research = await map_reduce_compress_research(
+                researcher_messages, 
+                state.get("research_topic", ""), 
+                synthesizer_model, 
+                configurable, 
+                compression_budget
+            )
+            return {
+                "compressed_research": compressed_research,
+                "raw_notes": [offload_to_blob_store(get_raw_notes_content(researcher_messages), configurable)]
+            }
+    
+    # Step 4: Attempt compression with retry logic for token limit issues
     synthesis_attempts = 0
     max_attempts = 3
     
@@ -599,41 +1038,38 @@ async def compress_research(state: ResearcherState, config: RunnableConfig):
             compression_prompt = compress_research_system_prompt.format(date=get_today_str())
             messages = [SystemMessage(content=compression_prompt)] + researcher_messages
             
+            # Fit the transcript to the compression model's window before calling
+            messages = fit_messages_to_budget(messages, configurable.compression_model, compression_budget)
+            
             # Execute compression
             response = await synthesizer_model.ainvoke(messages)
             
             # Extract raw notes from all tool and AI messages
-            raw_notes_content = "\n".join([
-                str(message.content) 
-                for message in filter_messages(researcher_messages, include_types=["tool", "ai"])
-            ])
+            raw_notes_content = get_raw_notes_content(researcher_messages)
             
             # Return successful compression result
             return {
                 "compressed_research": str(response.content),
-                "raw_notes": [raw_notes_content]
+                "raw_notes": [offload_to_blob_store(raw_notes_content, configurable)]
             }
             
         except Exception as e:
             synthesis_attempts += 1
             
             # Handle token limit exceeded by removing older messages
-            if is_token_limit_exceeded(e, configurable.research_model):
+            if is_token_limit_exceeded(e, configurable.compression_model):
                 researcher_messages = remove_up_to_last_ai_message(researcher_messages)
                 continue
             
             # For other errors, continue retrying
             continue
     
-    # Step 4: Return error result if all attempts failed
-    raw_notes_content = "\n".join([
-        str(message.content) 
-        for message in filter_messages(researcher_messages, include_types=["tool", "ai"])
-    ])
+    # Step 5: Return error result if all attempts failed
+    raw_notes_content = get_raw_notes_content(researcher_messages)
     
     return {
         "compressed_research": "Error synthesizing research report: Maximum retries exceeded",
-        "raw_notes": [raw_notes_content]
+        "raw_notes": [offload_to_blob_store(raw_notes_content, configurable)]
     }
 
 # Researcher Subgraph Construction
@@ -683,23 +1119,35 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
         "tags": ["langsmith:nostream"]
     }
     
-    # Step 3: Attempt report generation with token limit retry logic
+    # Step 3: Pre-flight the prompt and fit the findings to the model's context window
+    def build_final_report_prompt(findings_text):
+        return final_report_generation_prompt.format(
+            research_brief=state.get("research_brief", ""),
+            messages=get_buffer_string(state.get("messages", [])),
+            findings=findings_text,
+            date=get_today_str()
+        )
+    
+    findings_token_limit = None
+    input_budget = get_model_capabilities(
+        configurable.final_report_model, configurable.final_report_model_max_tokens
+    ).input_budget(configurable.context_window_safety_margin)
+    if input_budget is not None:
+        prompt_overhead = count_tokens(build_final_report_prompt(""), configurable.final_report_model)
+        findings_token_limit = max(input_budget - prompt_overhead, 0)
+        findings = truncate_to_token_budget(findings, configurable.final_report_model, findings_token_limit)
+    
+    # Step 4: Attempt report generation with token limit retry logic
     max_retries = 3
     current_retry = 0
-    findings_token_limit = None
     
     while current_retry <= max_retries:
         try:
             # Create comprehensive prompt with all research context
-            final_report_prompt = final_report_generation_prompt.format(
-                research_brief=state.get("research_brief", ""),
-                messages=get_buffer_string(state.get("messages", [])),
-                findings=findings,
-                date=get_today_str()
-            )
+            final_report_prompt = build_final_report_prompt(findings)
             
             # Generate the final report
-            final_report = await configurable_model.with_config(writer_model_config).ainvoke([
+            final_report = await get_configured_model(writer_model_config).ainvoke([
                 HumanMessage(content=final_report_prompt)
             ])
             
@@ -715,23 +1163,16 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
             if is_token_limit_exceeded(e, configurable.final_report_model):
                 current_retry += 1
                 
-                if current_retry == 1:
-                    # First retry: determine initial truncation limit
-                    model_token_limit = get_model_token_limit(configurable.final_report_model)
-                    if not model_token_limit:
-                        return {
-                            "final_report": f"Error generating final report: Token limit exceeded, however, we could not determine the model's maximum context length. Please update the model map in deep_researcher/utils.py with this information. {e}",
-                            "messages": [AIMessage(content="Report generation failed due to token limits")],
-                            **cleared_state
-                        }
-                    # Use 4x token limit as character approximation for truncation
-                    findings_token_limit = model_token_limit * 4
-                else:
-                    # Subsequent retries: reduce by 10% each time
-                    findings_token_limit = int(findings_token_limit * 0.9)
+                if findings_token_limit is None:
+                    return {
+                        "final_report": f"Error generating final report: Token limit exceeded, however, we could not determine the model's maximum context length. Please update the model map in deep_researcher/utils.py with this information. {e}",
+                        "messages": [AIMessage(content="Report generation failed due to token limits")],
+                        **cleared_state
+                    }
                 
-                # Truncate findings and retry
-                findings = findings[:findings_token_limit]
+                # The estimate was too optimistic: reduce the findings budget by 10% and retry
+                findings_token_limit = int(findings_token_limit * 0.9)
+                findings = truncate_to_token_budget(findings, configurable.final_report_model, findings_token_limit)
                 continue
             else:
                 # Non-token-limit error: return error immediately
@@ -741,7 +1182,7 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
                     **cleared_state
                 }
     
-    # Step 4: Return failure result if all retries exhausted
+    # Step 5: Return failure result if all retries exhausted
     return {
         "final_report": "Error generating final report: Maximum retries exceeded",
         "messages": [AIMessage(content="Report generation failed after maximum retries")],
@@ -771,11 +1212,10 @@ async def structure_report_mdx(state: AgentState, config: RunnableConfig):
         "tags": ["langsmith:nostream"]
     }
 
-    structuring_model = (
-        configurable_model
-        .with_structured_output(MdxDocument)
-        .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
-        .with_config(structuring_model_config)
+    structuring_model = get_configured_model(
+        structuring_model_config,
+        output_schema=MdxDocument,
+        max_retries=configurable.max_structured_output_retries
     )
 
     # Step 2: Prepare the prompt and invoke the model
@@ -229,6 +229,71 @@ compress_research_simple_human_message = """All above messages are about researc
 
 DO NOT summarize the information. I want the raw information returned, just in a cleaner format. Make sure all relevant information is preserved - you can rewrite findings verbatim."""
 
+compress_research_merge_prompt = """You are a research assistant merging partial research findings into one report. A researcher's work on the topic below was too long to clean up in one pass, so consecutive parts of it were cleaned up separately. Your job is to combine these partial findings into a single set of findings without losing any information. For context, today's date is {date}.
+
+<Research Topic>
+{research_topic}
+</Research Topic>
+
+<Partial Findings>
+{partial_findings}
+</Partial Findings>
+
+<Task>
+Merge the partial findings into one fully comprehensive report.
+Keep all of the information and sources from every part, repeating key information verbatim.
+Only remove information that is duplicated across parts; if several parts state "X", you can say "These sources all stated X".
+</Task>
+
+<Output Format>
+The report should be structured like this:
+**List of Queries and Tool Calls Made**
+**Fully Comprehensive Findings**
+**List of All Relevant Sources (with citations in the report)**
+</Output Format>
+
+<Citation Rules>
+- Each part numbers its sources independently; renumber them so each unique URL has a single citation number across the merged report
+- Update the inline citations to match the new numbers
+- End with ### Sources that lists each source with corresponding numbers
+- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list
+- Example format:
+  [1] Source Title: URL
+  [2] Source Title: URL
+</Citation Rules>
+
+Critical Reminder: It is extremely important that any information that is even remotely relevant to the research topic is preserved verbatim (e.g. don't rewrite it, don't summarize it, don't paraphrase it).
+"""
+
+supervisor_digest_prompt = """You are maintaining a progress digest for a research supervisor that delegates research to sub-agents. The supervisor only sees this digest in place of its earlier research rounds, so it must be able to plan its next steps from the digest alone. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+<Current Digest>
+{previous_digest}
+</Current Digest>
+
+<New Research Rounds>
+{new_rounds}
+</New Research Rounds>
+
+Update the digest so it also covers the new research rounds. The updated digest should:
+1. List every research topic that has been delegated so far, so the supervisor does not delegate it again
+2. Summarize the key findings of each topic in a few sentences, keeping concrete facts, figures, names and dates
+3. Note the supervisor's reflections on gaps, open questions and planned next steps
+4. Point out topics whose research failed or returned little useful information
+
+Be concise: the digest should be much shorter than the rounds it covers. Respond with the updated digest only.
+"""
+
+supervisor_digest_human_message = """Here is a digest of the research rounds conducted so far. The full findings of these rounds are preserved and will be used for the final report.
+
+<Research Progress Digest>
+{digest}
+</Research Progress Digest>"""
+
 final_report_generation_prompt = """Based on all the research conducted, create a comprehensive, well-structured answer to the overall research brief:
 <Research Brief>
 {research_brief}
@@ -313,15 +378,9 @@ Format the report in clear markdown with proper structure and include source ref
 """
 
 
-summarize_webpage_prompt = """You are tasked with summarizing the raw content of a webpage retrieved from a web search. Your goal is to create a summary that preserves the most important information from the original web page. This summary will be used by a downstream research agent, so it's crucial to maintain the key details without losing essential information.
-
-Here is the raw content of the webpage:
-
-<webpage_content>
-{webpage_content}
-</webpage_content>
+summarize_webpage_intro = """You are tasked with summarizing the raw content of a webpage retrieved from a web search. Your goal is to create a summary that preserves the most important information from the original web page. This summary will be used by a downstream research agent, so it's crucial to maintain the key details without losing essential information."""
 
-Please follow these guidelines to create your summary:
+summarize_webpage_guidelines = """Please follow these guidelines to create your summary:
 
 1. Identify and preserve the main topic or purpose of the webpage.
 2. Retain key facts, statistics, and data points that are central to the content's message.
@@ -367,7 +426,47 @@ Example 2 (for a scientific article):
 }}
 ```
 
-Remember, your goal is to create a summary that can be easily understood and utilized by a downstream research agent while preserving the most critical information from the original webpage.
+Remember, your goal is to create a summary that can be easily understood and utilized by a downstream research agent while preserving the most critical information from the original webpage."""
+
+summarize_webpage_prompt = summarize_webpage_intro + """
+
+Here is the raw content of the webpage:
+
+<webpage_content>
+{webpage_content}
+</webpage_content>
+
+""" + summarize_webpage_guidelines + """
+
+Today's date is {date}.
+"""
+
+# Static instructions for prompt caching: the webpage content is sent in a separate user message
+summarize_webpage_system_prompt = summarize_webpage_intro + """ The raw content of the webpage is provided in the user message inside <webpage_content> tags.
+
+""" + summarize_webpage_guidelines
+
+summarize_webpage_human_message = """<webpage_content>
+{webpage_content}
+</webpage_content>
+
+Today's date is {date}."""
+
+summarize_webpages_batch_prompt = """You are tasked with summarizing the raw content of several short webpages retrieved from a web search. Your summaries will be used by a downstream research agent, so it's crucial to maintain the key details of each page without losing essential information.
+
+Here are the {webpage_count} webpages, each wrapped in numbered tags:
+
+{webpages}
+
+Please follow these guidelines for every webpage:
+
+1. Summarize each webpage independently. Never mix facts from different webpages in the same summary.
+2. Identify and preserve the main topic or purpose of the webpage.
+3. Retain key facts, statistics, data points, dates, names, and locations.
+4. Keep important quotes from credible sources or experts as key excerpts, up to a maximum of 5 per webpage.
+5. Keep each summary significantly shorter than the original unless the content is already concise.
+
+Return exactly {webpage_count} summaries, one per webpage, in the same order as the webpages above. Each summary has a "summary" field and a "key_excerpts" field.
 
 Today's date is {date}.
 """
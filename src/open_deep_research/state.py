@@ -28,6 +28,13 @@ class Summary(BaseModel):
     summary: str
     key_excerpts: str
 
+class SummaryBatch(BaseModel):
+    """Research summaries for several webpages summarized in one call."""
+    
+    summaries: list[Summary] = Field(
+        description="One summary per webpage, in the same order as the webpages were given.",
+    )
+
 class ClarifyWithUser(BaseModel):
     """Model for user clarification requests."""
     
@@ -89,12 +96,17 @@ class SupervisorState(TypedDict):
     notes: Annotated[list[str], override_reducer] = []
     research_iterations: int = 0
     raw_notes: Annotated[list[str], override_reducer] = []
+    supervisor_digest: Optional[str] = None
+    digested_round_count: int = 0
 
 class ResearcherState(TypedDict):
     """State for individual researchers conducting research."""
     
-    researcher_messages: Annotated[list[MessageLikeRepresentation], operator.add]
+    researcher_messages: Annotated[list[MessageLikeRepresentation], override_reducer]
     tool_call_iterations: int = 0
+    started_at: Optional[float] = None
+    tokens_used: int = 0
+    search_calls: int = 0
     research_topic: str
     compressed_research: str
     raw_notes: Annotated[list[str], override_reducer] = []
@@ -0,0 +1,362 @@
+"""Local text processing helpers that reduce how much content is sent to models."""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import List
+
+# Common English words that carry no signal for relevance scoring
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how in is it its of on or "
+    "that the their this to was were what when where which who why will with".split()
+)
+
+# Navigation, consent and footer lines that consist of nothing but a chrome phrase
+BOILERPLATE_PATTERNS = re.compile(
+    r"^\W*(skip to (main )?content|cookies?( settings| preferences)?|accept( all)? cookies|privacy policy|"
+    r"terms of (use|service)|sign (in|up)|log ?in|subscribe|share (this|on)|follow us|all rights reserved|"
+    r"©|copyright|advertisement|menu|search|home)\W*$",
+    re.IGNORECASE,
+)
+
+MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, dropping stopwords.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of content-bearing tokens in order of appearance
+    """
+    return [token for token in re.findall(r"\w+", text.casefold()) if token not in STOPWORDS]
+
+
+def strip_boilerplate(text: str) -> str:
+    """Remove navigation, link-list and repeated lines from scraped page text.
+
+    Args:
+        text: Raw page content, typically markdown produced by the search API
+
+    Returns:
+        Page content with boilerplate lines removed and paragraph breaks preserved
+    """
+    kept_lines = []
+    seen_lines = set()
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            kept_lines.append("")
+            continue
+
+        # Lines that are mostly link markup are menus, breadcrumbs or related-article lists
+        link_free = MARKDOWN_LINK.sub(r"\1", stripped)
+        link_chars = len(stripped) - len(link_free)
+        if link_chars > 0.5 * len(stripped):
+            continue
+
+        # Short lines matching known chrome phrases or repeated verbatim are page furniture
+        is_short = len(link_free) < 80
+        normalized = link_free.casefold()
+        if is_short and (BOILERPLATE_PATTERNS.match(normalized) or normalized in seen_lines):
+            continue
+        seen_lines.add(normalized)
+        kept_lines.append(line)
+
+    # Collapse the runs of blank lines left behind by removed lines
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept_lines)).strip()
+
+
+def split_passages(text: str, target_chars: int = 800) -> List[str]:
+    """Split text into passages of roughly target_chars characters.
+
+    Paragraphs are the unit of splitting: short consecutive paragraphs are merged
+    and paragraphs much longer than the target are split on sentence boundaries.
+
+    Args:
+        text: Text to split
+        target_chars: Desired passage length in characters
+
+    Returns:
+        List of passages in document order
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= 2 * target_chars:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(split_sentences(paragraph))
+
+    passages = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > target_chars:
+            passages.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation followed by whitespace."""
+    return [sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+", text) if sentence.strip()]
+
+
+def bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Score documents against a query with Okapi BM25.
+
+    Args:
+        query: Query text
+        documents: Documents to score
+        k1: Term frequency saturation parameter
+        b: Document length normalization parameter
+
+    Returns:
+        One relevance score per document, higher is more relevant
+    """
+    query_terms = set(tokenize(query))
+    tokenized_documents = [tokenize(document) for document in documents]
+    if not query_terms or not tokenized_documents:
+        return [0.0] * len(documents)
+
+    document_count = len(tokenized_documents)
+    average_length = sum(len(tokens) for tokens in tokenized_documents) / document_count or 1.0
+    document_frequency = Counter(
+        term for tokens in tokenized_documents for term in set(tokens) if term in query_terms
+    )
+
+    scores = []
+    for tokens in tokenized_documents:
+        term_counts = Counter(tokens)
+        score = 0.0
+        for term in query_terms:
+            frequency = term_counts.get(term, 0)
+            if not frequency:
+                continue
+            idf = math.log((document_count - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5) + 1)
+            length_norm = k1 * (1 - b + b * len(tokens) / average_length)
+            score += idf * frequency * (k1 + 1) / (frequency + length_norm)
+        scores.append(score)
+    return scores
+
+
+def select_relevant_passages(text: str, query: str, max_chars: int) -> str:
+    """Keep the passages of a page most relevant to a query within a character budget.
+
+    Boilerplate is stripped first; if the remaining text fits the budget it is
+    returned whole. Otherwise passages are ranked with BM25 against the query and
+    packed greedily, then re-emitted in their original order so the page still reads
+    coherently.
+
+    Args:
+        text: Raw page content
+        query: Search query that surfaced the page
+        max_chars: Character budget for the returned content
+
+    Returns:
+        Filtered page content no longer than max_chars
+    """
+    cleaned = strip_boilerplate(text)
+    if len(cleaned) <= max_chars:
+        return cleaned
+
+    passages = split_passages(cleaned)
+    scores = bm25_scores(query, passages)
+
+    # Rank by relevance, breaking ties in favour of earlier passages (leads matter)
+    ranked = sorted(range(len(passages)), key=lambda index: (-scores[index], index))
+    selected = []
+    used_chars = 0
+    for index in ranked:
+        passage_chars = len(passages[index]) + 2
+        if used_chars + passage_chars > max_chars:
+            continue
+        selected.append(index)
+        used_chars += passage_chars
+
+    if not selected:
+        # Every passage is larger than the budget; fall back to the best one truncated
+        return passages[ranked[0]][:max_chars]
+    return "\n\n".join(passages[index] for index in sorted(selected))
+
+
+def extractive_summary(text: str, max_chars: int) -> str:
+    """Summarize text locally by extracting its most central sentences.
+
+    Sentences are scored by the average document frequency of their words, a cheap
+    stand-in for TextRank centrality, with a bonus for sentences near the start of
+    the page where news and reference pages put their key facts. The best sentences
+    are packed into the budget and returned in their original order.
+
+    Args:
+        text: Page content to summarize
+        max_chars: Maximum length of the returned summary
+
+    Returns:
+        Extractive summary no longer than max_chars
+    """
+    cleaned = strip_boilerplate(text)
+    if len(cleaned) <= max_chars:
+        return cleaned
+
+    sentences = [
+        sentence for paragraph in re.split(r"\n\s*\n", cleaned)
+        for sentence in split_sentences(paragraph.replace("\n", " "))
+    ]
+    tokenized_sentences = [tokenize(sentence) for sentence in sentences]
+    word_counts = Counter(token for tokens in tokenized_sentences for token in tokens)
+
+    scores = []
+    for position, tokens in enumerate(tokenized_sentences):
+        if len(tokens) < 4:
+            # Fragments such as headings, captions and list bullets are rarely informative
+            scores.append(0.0)
+            continue
+        centrality = sum(word_counts[token] for token in tokens) / len(tokens)
+        lead_bonus = 1.0 + 1.0 / (1 + position / 5)
+        scores.append(centrality * lead_bonus)
+
+    ranked = sorted(range(len(sentences)), key=lambda index: (-scores[index], index))
+    selected = []
+    used_chars = 0
+    for index in ranked:
+        sentence_chars = len(sentences[index]) + 1
+        if used_chars + sentence_chars > max_chars:
+            continue
+        selected.append(index)
+        used_chars += sentence_chars
+
+    if not selected:
+        return cleaned[:max_chars]
+    return " ".join(sentences[index] for index in sorted(selected))
+
+
+def simhash(text: str, shingle_size: int = 4) -> int:
+    """Compute a 64-bit SimHash fingerprint over word shingles.
+
+    Texts that share most of their shingles get fingerprints that differ in only a
+    few bits, so the Hamming distance between fingerprints approximates how different
+    two pages are.
+
+    Args:
+        text: Text to fingerprint
+        shingle_size: Number of consecutive words per shingle
+
+    Returns:
+        64-bit fingerprint as an integer
+    """
+    words = re.findall(r"\w+", text.casefold())
+    shingles = [
+        " ".join(words[index:index + shingle_size])
+        for index in range(max(len(words) - shingle_size + 1, 1))
+    ]
+    # Tally hash bytes per position rather than looping over all 64 bits of every
+    # shingle; each position has at most 256 distinct values to expand into bits
+    byte_counts = [Counter() for _ in range(8)]
+    total = 0
+    for shingle, count in Counter(shingles).items():
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        for position, byte in enumerate(digest):
+            byte_counts[position][byte] += count
+        total += count
+
+    # A bit is set when the shingles with that bit set outweigh those without it
+    fingerprint = 0
+    for position, counts in enumerate(byte_counts):
+        for bit in range(8):
+            ones = sum(count for byte, count in counts.items() if byte >> bit & 1)
+            if 2 * ones > total:
+                fingerprint |= 1 << ((7 - position) * 8 + bit)
+    return fingerprint
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Count the differing bits between two fingerprints."""
+    return bin(first ^ second).count("1")
+
+
+def group_near_duplicates(texts: List[str], max_distance: int = 6, min_words: int = 50) -> List[List[int]]:
+    """Group texts whose SimHash fingerprints are within max_distance bits.
+
+    Texts with fewer than min_words words are never grouped, since fingerprints of
+    very short texts are too noisy to compare reliably.
+
+    Args:
+        texts: Texts to compare
+        max_distance: Maximum Hamming distance for two texts to count as duplicates
+        min_words: Minimum number of words for a text to take part in grouping
+
+    Returns:
+        Groups of indices into texts, each starting with its first occurrence, covering every index once
+    """
+    groups: List[List[int]] = []
+    representatives: List[tuple[int, int]] = []
+    for index, text in enumerate(texts):
+        if len(re.findall(r"\w+", text)) < min_words:
+            groups.append([index])
+            continue
+        fingerprint = simhash(text)
+        for group_position, representative in representatives:
+            if hamming_distance(fingerprint, representative) <= max_distance:
+                groups[group_position].append(index)
+                break
+        else:
+            representatives.append((len(groups), fingerprint))
+            groups.append([index])
+    return groups
+
+
+def stem(token: str) -> str:
+    """Strip common English inflections so plural and verb forms of a word match."""
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def cosine_similarities(query: str, documents: List[str]) -> List[float]:
+    """Compare a query with documents by TF-IDF weighted cosine similarity of their words.
+
+    Words are lightly stemmed, and inverse document frequencies are computed over the
+    query and documents together, so words shared by every text count for little.
+
+    Args:
+        query: Text to compare
+        documents: Texts to compare the query against
+
+    Returns:
+        One similarity per document, from 0.0 (no shared words) to 1.0 (same word distribution)
+    """
+    if not documents:
+        return []
+    tokenized = [Counter(stem(token) for token in tokenize(text)) for text in [query, *documents]]
+    document_frequency = Counter(term for counts in tokenized for term in counts)
+    text_count = len(tokenized)
+
+    vectors = []
+    for counts in tokenized:
+        vector = {
+            term: count * (math.log((text_count + 1) / (document_frequency[term] + 1)) + 1)
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append((vector, norm))
+
+    query_vector, query_norm = vectors[0]
+    similarities = []
+    for vector, norm in vectors[1:]:
+        if not query_norm or not norm:
+            similarities.append(0.0)
+            continue
+        dot = sum(weight * vector.get(term, 0.0) for term, weight in query_vector.items())
+        similarities.append(dot / (query_norm * norm))
+    return similarities
@@ -0,0 +1,413 @@
+"""Local token counting and context-window budgeting for model prompts."""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from langchain_core.messages import MessageLikeRepresentation
+
+from open_deep_research.text_utils import extractive_summary
+from open_deep_research.utils import get_model_token_limit
+
+# Characters per token measured on English research transcripts for providers whose
+# tokenizers are not available locally; lower ratios give more conservative estimates
+CHARS_PER_TOKEN = {
+    "openai": 4.0,
+    "azure_openai": 4.0,
+    "anthropic": 3.5,
+    "bedrock": 3.5,
+    "google": 4.0,
+    "google_genai": 4.0,
+    "google_vertexai": 4.0,
+    "cohere": 4.0,
+    "mistral": 3.5,
+    "ollama": 3.5,
+}
+DEFAULT_CHARS_PER_TOKEN = 3.5
+
+# Per-message formatting tokens added by chat templates (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@dataclass(frozen=True)
+class ModelCapabilities:
+    """Context window and output limits of a model."""
+
+    model_name: str
+    context_window: Optional[int]
+    max_output_tokens: int
+
+    def input_budget(self, safety_margin: float = 0.1) -> Optional[int]:
+        """Return how many prompt tokens fit alongside the output, or None if the window is unknown.
+
+        Args:
+            safety_margin: Fraction of the window held back for estimation error and tool schemas
+        """
+        if not self.context_window:
+            return None
+        reserved = self.max_output_tokens + int(self.context_window * safety_margin)
+        return max(self.context_window - reserved, 0)
+
+
+def get_model_capabilities(model_name: str, max_output_tokens: int) -> ModelCapabilities:
+    """Look up the capabilities of a model from the MODEL_TOKEN_LIMITS table.
+
+    Args:
+        model_name: Model identifier such as "openai:gpt-4.1"
+        max_output_tokens: Output token limit configured for the model
+
+    Returns:
+        Capabilities with an unknown (None) context window for unlisted models
+    """
+    return ModelCapabilities(
+        model_name=model_name,
+        context_window=get_model_token_limit(model_name),
+        max_output_tokens=max_output_tokens or 0,
+    )
+
+
+def get_provider(model_name: str) -> str:
+    """Return the provider prefix of a "provider:model" identifier."""
+    return model_name.split(":", 1)[0].lower() if ":" in model_name else ""
+
+
+def get_tiktoken_encoding(model_name: str) -> Optional[Any]:
+    """Return the tiktoken encoding for an OpenAI model, or None if unavailable."""
+    if get_provider(model_name) not in ("openai", "azure_openai"):
+        return None
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        encoding_name = tiktoken.encoding_name_for_model(model_name.split(":", 1)[1])
+    except KeyError:
+        encoding_name = "o200k_base"
+    return load_tiktoken_encoding(encoding_name)
+
+
+# Loaded encodings, and names whose loading has started (so it is attempted only once)
+_tiktoken_encodings: Dict[str, Any] = {}
+_tiktoken_loads_started: Set[str] = set()
+
+
+def load_tiktoken_encoding(encoding_name: str) -> Optional[Any]:
+    """Return a tiktoken encoding by name if it is available without network access.
+
+    tiktoken downloads its vocabularies on first use with no timeout, which would
+    block the event loop of the calling node. Encodings whose vocabulary is already
+    in tiktoken's local cache are loaded directly; others are loaded once in a
+    background thread, and the calibrated estimator is used until that finishes
+    (or for good, if it fails).
+
+    Returns:
+        The encoding, or None while it is unavailable
+    """
+    encoding = _tiktoken_encodings.get(encoding_name)
+    if encoding is not None or encoding_name in _tiktoken_loads_started:
+        return encoding
+
+    _tiktoken_loads_started.add(encoding_name)
+    if is_tiktoken_vocabulary_cached(encoding_name):
+        return _load_tiktoken_encoding(encoding_name)
+    threading.Thread(target=_load_tiktoken_encoding, args=(encoding_name,), daemon=True).start()
+    return None
+
+
+def _load_tiktoken_encoding(encoding_name: str) -> Optional[Any]:
+    """Load a tiktoken encoding and store it for later calls, or return None on failure."""
+    import tiktoken
+
+    try:
+        encoding = tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logging.warning(f"Could not load tiktoken encoding {encoding_name}, estimating token counts instead: {str(e)}")
+        return None
+    _tiktoken_encodings[encoding_name] = encoding
+    return encoding
+
+
+def is_tiktoken_vocabulary_cached(encoding_name: str) -> bool:
+    """Check whether tiktoken's file cache already holds the vocabulary of an OpenAI encoding.
+
+    Mirrors the cache layout of tiktoken.load.read_file_cached: files are named by
+    the SHA-1 of the vocabulary URL inside TIKTOKEN_CACHE_DIR, DATA_GYM_CACHE_DIR or
+    the temporary directory's data-gym-cache.
+    """
+    cache_dir = os.environ.get(
+        "TIKTOKEN_CACHE_DIR", 
+        os.environ.get("DATA_GYM_CACHE_DIR", os.path.join(tempfile.gettempdir(), "data-gym-cache"))
+    )
+    if not cache_dir:
+        return False
+    vocabulary_url = f"https://openaipublic.blob.core.windows.net/encodings/{encoding_name}.tiktoken"
+    return os.path.exists(os.path.join(cache_dir, hashlib.sha1(vocabulary_url.encode()).hexdigest()))
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    """Count the tokens of text for a model.
+
+    Uses the model's tokenizer when available locally and a calibrated
+    characters-per-token estimate for the provider otherwise.
+    """
+    if not text:
+        return 0
+    encoding = get_tiktoken_encoding(model_name)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    chars_per_token = CHARS_PER_TOKEN.get(get_provider(model_name), DEFAULT_CHARS_PER_TOKEN)
+    return math.ceil(len(text) / chars_per_token)
+
+
+def get_message_text(message: MessageLikeRepresentation) -> str:
+    """Return the text a message contributes to the prompt, including tool call arguments."""
+    content = message.content
+    if isinstance(content, str):
+        text = content
+    else:
+        text = "\n".join(
+            block if isinstance(block, str) else str(block.get("text") or block.get("content") or "")
+            for block in content
+        )
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        text += json.dumps([[call["name"], call["args"]] for call in tool_calls], default=str)
+    return text
+
+
+def count_message_tokens(messages: List[MessageLikeRepresentation], model_name: str) -> int:
+    """Count the prompt tokens of a list of messages for a model."""
+    return sum(
+        count_tokens(get_message_text(message), model_name) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def truncate_to_token_budget(text: str, model_name: str, max_tokens: int) -> str:
+    """Truncate text from the end so it fits within max_tokens.
+
+    Args:
+        text: Text to truncate
+        model_name: Model whose tokenizer defines the budget
+        max_tokens: Maximum number of tokens to keep
+
+    Returns:
+        The longest prefix of text found to fit the budget
+    """
+    if max_tokens <= 0:
+        return ""
+    token_count = count_tokens(text, model_name)
+    if token_count <= max_tokens:
+        return text
+
+    # Scale by the measured ratio, then shrink until the estimate fits
+    keep_chars = int(len(text) * max_tokens / token_count)
+    while keep_chars > 0 and count_tokens(text[:keep_chars], model_name) > max_tokens:
+        keep_chars = int(keep_chars * 0.95)
+    return text[:keep_chars]
+
+
+def split_into_turns(
+    messages: List[MessageLikeRepresentation],
+) -> tuple[List[MessageLikeRepresentation], List[List[MessageLikeRepresentation]], List[MessageLikeRepresentation]]:
+    """Split a transcript into leading instructions, tool-calling turns and trailing requests.
+
+    Args:
+        messages: Transcript, oldest first
+
+    Returns:
+        The leading system and human messages, the turns in between (each an AI
+        message with the tool results that answer it), and the trailing human messages
+    """
+    head_end = 0
+    while head_end < len(messages) and messages[head_end].type in ("system", "human"):
+        head_end += 1
+    tail_start = len(messages)
+    while tail_start > head_end and messages[tail_start - 1].type == "human":
+        tail_start -= 1
+
+    # Group the body into turns that start at each AI message
+    turns: List[List[MessageLikeRepresentation]] = []
+    for message in messages[head_end:tail_start]:
+        if message.type == "ai" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return messages[:head_end], turns, messages[tail_start:]
+
+
+def keep_tool_calls(message: MessageLikeRepresentation, tool_call_ids: set) -> MessageLikeRepresentation:
+    """Copy an AI message keeping only the given tool calls.
+
+    Both the parsed tool_calls and any provider tool_use blocks in a list content are
+    filtered, so every call left in the message has a result in the same prompt.
+
+    Args:
+        message: AI message that made the tool calls
+        tool_call_ids: IDs of the tool calls to keep
+
+    Returns:
+        Copy of message with the other tool calls removed
+    """
+    content = message.content
+    if isinstance(content, list):
+        content = [
+            block for block in content
+            if not (isinstance(block, dict) and block.get("type") == "tool_use" and block.get("id") not in tool_call_ids)
+        ]
+    return message.model_copy(update={
+        "content": content,
+        "tool_calls": [call for call in message.tool_calls if call["id"] in tool_call_ids],
+    })
+
+
+def pack_turns_into_chunks(
+    turns: List[List[MessageLikeRepresentation]],
+    model_name: str,
+    max_tokens: int,
+) -> List[List[MessageLikeRepresentation]]:
+    """Pack consecutive turns into chunks of at most max_tokens tokens each.
+
+    Every tool result stays in the same chunk as the AI message that called it. A
+    turn larger than max_tokens is split across chunks that each repeat its AI
+    message; a single tool result larger than max_tokens still forms a chunk of its own.
+
+    Args:
+        turns: Tool-calling turns, oldest first
+        model_name: Model whose tokenizer defines the budget
+        max_tokens: Token budget of each chunk
+
+    Returns:
+        Chunks of messages in transcript order
+    """
+    pieces: List[List[MessageLikeRepresentation]] = []
+    for turn in turns:
+        if turn[0].type == "ai" and len(turn) > 2 and count_message_tokens(turn, model_name) > max_tokens:
+            pieces.extend([keep_tool_calls(turn[0], {message.tool_call_id}), message] for message in turn[1:])
+        else:
+            pieces.append(turn)
+
+    chunks: List[List[MessageLikeRepresentation]] = []
+    chunk_tokens = 0
+    for turn in pieces:
+        turn_tokens = count_message_tokens(turn, model_name)
+        if chunks and chunk_tokens + turn_tokens <= max_tokens:
+            chunks[-1].extend(turn)
+            chunk_tokens += turn_tokens
+        else:
+            chunks.append(list(turn))
+            chunk_tokens = turn_tokens
+    return chunks
+
+
+def fit_messages_to_budget(
+    messages: List[MessageLikeRepresentation],
+    model_name: str,
+    max_tokens: Optional[int],
+) -> List[MessageLikeRepresentation]:
+    """Drop the oldest tool-calling turns until messages fit within max_tokens.
+
+    Leading system and human messages (the instructions and research topic) and
+    trailing human messages are always kept. The turns in between, each an AI
+    message with the tool results that answer it, are dropped oldest first so no
+    tool result is left without its call. If the latest turn alone is still too
+    large, its tool results are truncated to share the remaining budget.
+
+    Args:
+        messages: Messages about to be sent to the model
+        model_name: Model the messages are sent to
+        max_tokens: Prompt token budget, or None to skip fitting
+
+    Returns:
+        Messages that fit the budget; the original list if it already fits
+    """
+    if max_tokens is None or count_message_tokens(messages, model_name) <= max_tokens:
+        return messages
+
+    head, turns, tail = split_into_turns(messages)
+    body = [message for turn in turns for message in turn]
+
+    fixed_tokens = count_message_tokens(head + tail, model_name)
+    turn_tokens = [count_message_tokens(turn, model_name) for turn in turns]
+    while len(turns) > 1 and fixed_tokens + sum(turn_tokens) > max_tokens:
+        turns.pop(0)
+        turn_tokens.pop(0)
+
+    kept = [message for turn in turns for message in turn]
+    if turns and fixed_tokens + turn_tokens[0] > max_tokens:
+        tool_messages = [message for message in kept if message.type == "tool"]
+        other_tokens = count_message_tokens(
+            [message for message in kept if message.type != "tool"], model_name
+        )
+        available = max_tokens - fixed_tokens - other_tokens
+        if tool_messages:
+            per_message_tokens = max(available // len(tool_messages) - MESSAGE_OVERHEAD_TOKENS, 0)
+            kept = [
+                message.model_copy(update={
+                    "content": truncate_to_token_budget(get_message_text(message), model_name, per_message_tokens)
+                }) if message.type == "tool" else message
+                for message in kept
+            ]
+
+    logging.info(
+        f"Fitted prompt for {model_name} to {max_tokens} tokens by dropping "
+        f"{len(body) - len(kept)} of {len(body)} intermediate messages"
+    )
+    return head + kept + tail
+
+
+def compact_tool_messages(
+    messages: List[MessageLikeRepresentation],
+    keep_recent_turns: int,
+    max_chars: int,
+    verbatim_tools: tuple = ("think_tool",),
+) -> tuple[List[MessageLikeRepresentation], List[str]]:
+    """Replace the contents of older tool results with local extractive summaries.
+
+    Tool results answering the last keep_recent_turns AI messages, results of
+    verbatim_tools (such as think_tool reflections), results already compacted and
+    results no longer than max_chars are left untouched.
+
+    Args:
+        messages: Researcher transcript, oldest first
+        keep_recent_turns: Number of most recent tool-calling turns kept verbatim
+        max_chars: Length bound of each compacted tool result
+        verbatim_tools: Names of tools whose results are never compacted
+
+    Returns:
+        The compacted transcript and the original contents of the messages that were compacted
+    """
+    ai_indices = [index for index, message in enumerate(messages) if message.type == "ai"]
+    if len(ai_indices) <= keep_recent_turns:
+        return messages, []
+    recent_start = ai_indices[-keep_recent_turns] if keep_recent_turns > 0 else len(messages)
+
+    # Resolve tool names from the calls, since tool results do not always carry them
+    tool_names = {
+        call["id"]: call["name"]
+        for message in messages if message.type == "ai"
+        for call in (message.tool_calls or [])
+    }
+
+    compacted = list(messages)
+    originals = []
+    for index, message in enumerate(messages[:recent_start]):
+        if message.type != "tool" or message.additional_kwargs.get("compacted"):
+            continue
+        if (message.name or tool_names.get(message.tool_call_id)) in verbatim_tools:
+            continue
+        content = get_message_text(message)
+        if len(content) <= max_chars:
+            continue
+        compacted[index] = message.model_copy(update={
+            "content": f"{extractive_summary(content, max_chars)}\n\n[Older tool output compacted to its key sentences]",
+            "additional_kwargs": {**message.additional_kwargs, "compacted": True},
+        })
+        originals.append(content)
+    return compacted, originals
@@ -1,13 +1,18 @@
 """Utility functions and helpers for the Deep Research agent."""
 
 import asyncio
+import hashlib
+import inspect
 import json
 import logging
 import os
+import time
 import warnings
+import weakref
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Annotated, Any, Dict, List, Literal, Optional
+from typing import Annotated, Any, Callable, Dict, List, Literal, Optional
 
 import aiohttp
 from langchain.chat_models import init_chat_model
@@ -16,9 +21,11 @@ from langchain_core.messages import (
     AIMessage,
     HumanMessage,
     MessageLikeRepresentation,
+    SystemMessage,
+    ToolMessage,
     filter_messages,
 )
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_core.tools import (
     BaseTool,
     InjectedToolArg,
@@ -31,10 +38,40 @@ from langgraph.config import get_store
 from mcp import McpError
 from tavily import AsyncTavilyClient
 
-from open_deep_research.configuration import Configuration, SearchAPI
-from open_deep_research.prompts import summarize_webpage_prompt
+from open_deep_research.blob_store import BlobStore, is_blob_ref
+from open_deep_research.cache import (
+    BaseCache,
+    InMemoryCache,
+    SingleFlight,
+    SQLiteCache,
+    make_cache_key,
+)
+from open_deep_research.configuration import (
+    Configuration,
+    DedupScope,
+    SearchAPI,
+    SearchCacheBackend,
+)
+from open_deep_research.prompts import (
+    summarize_webpage_human_message,
+    summarize_webpage_prompt,
+    summarize_webpage_system_prompt,
+    summarize_webpages_batch_prompt,
+)
 from open_deep_research.rag_utils import create_rag_tool
-from open_deep_research.state import AgentState, ResearchComplete, Summary
+from open_deep_research.state import (
+    AgentState,
+    ResearchComplete,
+    Summary,
+    SummaryBatch,
+)
+from open_deep_research.text_utils import (
+    bm25_scores,
+    cosine_similarities,
+    extractive_summary,
+    group_near_duplicates,
+    select_relevant_passages,
+)
 
 ##########################
 # Tavily Search Tool Utils
@@ -61,13 +98,17 @@ async def tavily_search(
     Returns:
         Formatted string containing summarized search results
     """
-    # Step 1: Execute search queries asynchronously
+    # Step 1: Execute search queries asynchronously, within the call deadline if one is set.
+    # A slow query may use at most half of the deadline so summarization still gets time.
+    configurable = Configuration.from_runnable_config(config)
+    deadline = Deadline(configurable.search_deadline_seconds or None)
     search_results = await tavily_search_async(
         queries,
         max_results=max_results,
         topic=topic,
-        include_raw_content=True,
-        config=config
+        include_raw_content=not configurable.tiered_content_fetch,
+        config=config,
+        timeout=deadline.remaining() / 2 if deadline.remaining() is not None else None
     )
     
     # Step 2: Deduplicate results by URL to avoid processing the same content multiple times
@@ -78,45 +119,176 @@ async def tavily_search(
             if url not in unique_results:
                 unique_results[url] = {**result, "query": response['query']}
     
-    # Step 3: Set up the summarization model with configuration
-    configurable = Configuration.from_runnable_config(config)
+    # Tiered fetching only saves work with a summary budget, so it always applies one
+    max_summarized_results = configurable.max_summarized_results
+    if configurable.tiered_content_fetch and max_summarized_results <= 0:
+        max_summarized_results = TIERED_FETCH_DEFAULT_SUMMARIZED_RESULTS
+    
+    # With tiered fetching, download full page content only for the results worth summarizing
+    urls_to_fetch = None
+    if configurable.tiered_content_fetch and unique_results:
+        urls_to_fetch = select_top_results(
+            unique_results, 
+            queries, 
+            max_summarized_results, 
+            configurable.rerank_results_locally
+        )
+        raw_contents = await fetch_raw_content(
+            [url for url in unique_results if url in urls_to_fetch],
+            config=config,
+            timeout=deadline.remaining() / 2 if deadline.remaining() is not None else None
+        )
+        for url, raw_content in raw_contents.items():
+            unique_results[url]["raw_content"] = raw_content
     
+    # Step 3: Set up the summarization model with configuration
     # Character limit to stay within model token limits (configurable)
     max_char_to_include = configurable.max_content_length
     
-    # Initialize summarization model with retry logic
-    model_api_key = get_api_key_for_model(configurable.summarization_model, config)
-    summarization_model = init_chat_model(
-        model=configurable.summarization_model,
-        max_tokens=configurable.summarization_model_max_tokens,
-        api_key=model_api_key,
-        tags=["langsmith:nostream"]
-    ).with_structured_output(Summary).with_retry(
+    # Collapse syndicated and mirrored pages into one source listing every URL; the
+    # CPU-bound fingerprinting runs off the event loop so parallel researchers keep going
+    if configurable.near_duplicate_detection:
+        unique_results = await asyncio.to_thread(
+            collapse_near_duplicates, 
+            unique_results, 
+            configurable.near_duplicate_max_distance,
+            max_char_to_include
+        )
+    
+    # Reuse the pooled summarization model and add structured output with retry logic
+    base_summarization_model = get_summarization_model(configurable, config)
+    summarization_model = base_summarization_model.with_structured_output(Summary).with_retry(
         stop_after_attempt=configurable.max_structured_output_retries
     )
     
-    # Step 4: Create summarization tasks (skip empty content)
-    async def noop():
-        """No-op function for results without raw content."""
-        return None
+    # Optionally race slow requests against a second one to the same or a fallback model
+    hedge_model = None
+    if configurable.summarization_hedging:
+        hedge_model_name = configurable.summarization_hedge_model or configurable.summarization_model
+        hedge_model = get_summarization_model(configurable, config, model_name=hedge_model_name).with_structured_output(Summary).with_retry(
+            stop_after_attempt=configurable.max_structured_output_retries
+        )
+    latency_policy = LatencyPolicy(
+        model_name=configurable.summarization_model,
+        max_timeout=configurable.summarization_timeout_seconds,
+        adaptive=configurable.summarization_adaptive_timeout,
+        hedge_model=hedge_model
+    )
+    
+    # Step 4: Prepare the content to summarize for each result (None if no raw content)
+    def prepare_content(result):
+        if not result.get("raw_content"):
+            return None
+        if configurable.content_prefilter_enabled:
+            # Score passages across the whole page so relevant text past the length cap is kept
+            return select_relevant_passages(
+                result['raw_content'],
+                result['query'],
+                min(configurable.prefilter_max_content_length, max_char_to_include)
+            )
+        return result['raw_content'][:max_char_to_include]
     
-    summarization_tasks = [
-        noop() if not result.get("raw_content") 
-        else summarize_webpage(
-            summarization_model, 
-            result['raw_content'][:max_char_to_include]
+    # Only the highest-ranked results across all queries are summarized; the rest keep snippets.
+    # With tiered fetching the selection is the fetched set, minus pages collapsed into another
+    if urls_to_fetch is not None:
+        selected_urls = urls_to_fetch & unique_results.keys()
+    else:
+        selected_urls = select_top_results(
+            unique_results, 
+            queries, 
+            max_summarized_results, 
+            configurable.rerank_results_locally
         )
-        for result in unique_results.values()
+    page_contents = [
+        prepare_content(result) if url in selected_urls else None
+        for url, result in unique_results.items()
     ]
     
-    # Step 5: Execute all summarization tasks in parallel
-    summaries = await asyncio.gather(*summarization_tasks)
+    # Reuse summaries generated earlier for the same model and content when enabled
+    summary_cache = get_summary_cache(configurable)
+    flight_scope = get_summarization_flight_scope(configurable, config)
+    
+    # Lay prompts out for provider prefix caching when enabled
+    prompt_caching_model = configurable.summarization_model if configurable.prompt_caching else None
+    
+    def get_cache_key(webpage_content):
+        return make_cache_key(configurable.summarization_model, webpage_content)
+    
+    def summarize_result(webpage_content):
+        cache_key = get_cache_key(webpage_content)
+        
+        def summarize():
+            return summarize_webpage(
+                summarization_model, 
+                webpage_content,
+                cache=summary_cache,
+                cache_key=cache_key,
+                fallback_max_chars=configurable.summarization_fallback_max_chars,
+                latency_policy=latency_policy,
+                prompt_caching_model=prompt_caching_model
+            )
+        
+        # Share one summarization with researchers requesting the same page concurrently
+        if flight_scope is None:
+            return summarize()
+        return summarization_flights.run(f"{flight_scope}:{cache_key}", summarize)
+    
+    # Step 5: Route each page: tiny pages pass through, short pages are batched
+    summaries = [None] * len(page_contents)
+    individual_indices = []
+    batch_indices = []
+    for index, webpage_content in enumerate(page_contents):
+        if webpage_content is None:
+            continue
+        if len(webpage_content) < configurable.summarization_skip_below_chars:
+            summaries[index] = webpage_content
+        elif (
+            configurable.summarization_batch_size > 1 and 
+            len(webpage_content) <= configurable.summarization_batch_page_max_chars
+        ):
+            batch_indices.append(index)
+        else:
+            individual_indices.append(index)
+    
+    batch_size = configurable.summarization_batch_size
+    batches = [batch_indices[i:i + batch_size] for i in range(0, len(batch_indices), batch_size)]
+    batch_summarization_model = base_summarization_model.with_structured_output(SummaryBatch).with_retry(
+        stop_after_attempt=configurable.max_structured_output_retries
+    ) if batches else None
+    
+    def summarize_batch(indices):
+        return summarize_webpage_batch(
+            batch_summarization_model,
+            summarization_model,
+            [page_contents[index] for index in indices],
+            cache=summary_cache,
+            cache_keys=[get_cache_key(page_contents[index]) for index in indices],
+            fallback_max_chars=configurable.summarization_fallback_max_chars,
+            latency_policy=latency_policy,
+            prompt_caching_model=prompt_caching_model
+        )
+    
+    # Execute all individual and batched summarization tasks in parallel; pages not
+    # summarized before the deadline keep a None summary and fall back to their snippet
+    task_results = await gather_until_deadline(
+        [
+            *(summarize_result(page_contents[index]) for index in individual_indices),
+            *(summarize_batch(batch) for batch in batches)
+        ],
+        deadline
+    )
+    for index, summary in zip(individual_indices, task_results[:len(individual_indices)]):
+        summaries[index] = summary
+    for batch, batch_summaries in zip(batches, task_results[len(individual_indices):]):
+        for index, summary in zip(batch, batch_summaries or [None] * len(batch)):
+            summaries[index] = summary
     
     # Step 6: Combine results with their summaries
     summarized_results = {
         url: {
             'title': result['title'], 
-            'content': result['content'] if summary is None else summary
+            'content': result['content'] if summary is None else summary,
+            'duplicate_urls': result.get('duplicate_urls', [])
         }
         for url, result, summary in zip(
             unique_results.keys(), 
@@ -132,7 +304,10 @@ async def tavily_search(
     formatted_output = "Search results: \n\n"
     for i, (url, result) in enumerate(summarized_results.items()):
         formatted_output += f"\n\n--- SOURCE {i+1}: {result['title']} ---\n"
-        formatted_output += f"URL: {url}\n\n"
+        formatted_output += f"URL: {url}\n"
+        if result['duplicate_urls']:
+            formatted_output += f"ALSO PUBLISHED AT: {', '.join(result['duplicate_urls'])}\n"
+        formatted_output += "\n"
         formatted_output += f"SUMMARY:\n{result['content']}\n\n"
         formatted_output += "\n\n" + "-" * 80 + "\n"
     
@@ -143,7 +318,8 @@ async def tavily_search_async(
     max_results: int = 5, 
     topic: Literal["general", "news", "finance"] = "general", 
     include_raw_content: bool = True, 
-    config: RunnableConfig = None
+    config: RunnableConfig = None,
+    timeout: Optional[float] = None
 ):
     """Execute multiple Tavily search queries asynchronously.
     
@@ -153,12 +329,30 @@ async def tavily_search_async(
         topic: Topic category for filtering results
         include_raw_content: Whether to include full webpage content
         config: Runtime configuration for API key access
+        timeout: Seconds to wait for the queries; queries still running are dropped
         
     Returns:
-        List of search result dictionaries from Tavily API
+        List of search result dictionaries from Tavily API, for the queries that completed
     """
-    # Initialize the Tavily client with API key from config
-    tavily_client = AsyncTavilyClient(api_key=get_tavily_api_key(config))
+    # Step 1: Serve fresh cached responses for queries seen before
+    configurable = Configuration.from_runnable_config(config)
+    search_cache = get_search_cache(configurable)
+    cache_keys = [
+        make_cache_key(normalize_search_query(query), topic, str(max_results), str(include_raw_content))
+        for query in search_queries
+    ]
+    cached_responses = [
+        search_cache.get(cache_key) if search_cache else None 
+        for cache_key in cache_keys
+    ]
+    uncached_queries = [
+        (query, cache_key) 
+        for query, cache_key, cached in zip(search_queries, cache_keys, cached_responses) 
+        if cached is None
+    ]
+    
+    # Step 2: Reuse the pooled Tavily client for the API key from config
+    tavily_client = get_tavily_client(get_tavily_api_key(config)) if uncached_queries else None
     
     # Create search tasks for parallel execution
     search_tasks = [
@@ -168,52 +362,973 @@ async def tavily_search_async(
             include_raw_content=include_raw_content,
             topic=topic
         )
-        for query in search_queries
+        for query, _ in uncached_queries
     ]
     
-    # Execute all search queries in parallel and return results
-    search_results = await asyncio.gather(*search_tasks)
+    # Execute the remaining search queries in parallel
+    if timeout is None:
+        fresh_results = await asyncio.gather(*search_tasks)
+    else:
+        fresh_results = await gather_until_deadline(search_tasks, Deadline(timeout))
+    
+    # Step 3: Store fresh responses with a topic-dependent freshness window
+    if search_cache:
+        ttl_seconds = (
+            configurable.search_cache_general_ttl_seconds if topic == "general"
+            else configurable.search_cache_news_ttl_seconds
+        )
+        for (_, cache_key), response in zip(uncached_queries, fresh_results):
+            if response is not None:
+                search_cache.set(cache_key, json.dumps(response), ttl_seconds=ttl_seconds)
+    
+    # Step 4: Return responses in query order, labelled with the query as issued
+    fresh_iter = iter(fresh_results)
+    search_results = []
+    for query, cached in zip(search_queries, cached_responses):
+        response = next(fresh_iter) if cached is None else {**json.loads(cached), "query": query}
+        if response is not None:
+            search_results.append(response)
     return search_results
 
-async def summarize_webpage(model: BaseChatModel, webpage_content: str) -> str:
+# Maximum number of URLs Tavily accepts in a single extract request
+TAVILY_EXTRACT_BATCH_SIZE = 20
+
+# Results summarized per call with tiered fetching when max_summarized_results is unset
+TIERED_FETCH_DEFAULT_SUMMARIZED_RESULTS = 5
+
+async def fetch_raw_content(
+    urls: List[str], 
+    config: RunnableConfig = None, 
+    timeout: Optional[float] = None
+) -> Dict[str, str]:
+    """Download full page content for specific URLs with batched Tavily extract calls.
+    
+    Args:
+        urls: URLs whose content should be fetched
+        config: Runtime configuration for API key access
+        timeout: Seconds to wait for the extract calls; unfinished batches are dropped
+        
+    Returns:
+        Mapping from URL to raw page content for the pages that were extracted
+    """
+    if not urls:
+        return {}
+    
+    tavily_client = get_tavily_client(get_tavily_api_key(config))
+    extract_tasks = [
+        tavily_client.extract(urls=urls[i:i + TAVILY_EXTRACT_BATCH_SIZE])
+        for i in range(0, len(urls), TAVILY_EXTRACT_BATCH_SIZE)
+    ]
+    
+    # Failed batches degrade to snippet-only results rather than failing the search
+    extract_responses = await gather_until_deadline(extract_tasks, Deadline(timeout))
+    raw_contents = {}
+    for response in extract_responses:
+        if response is None:
+            logging.warning("Tavily extract request failed or timed out, using search snippets")
+            continue
+        for result in response.get("results", []):
+            if result.get("raw_content"):
+                raw_contents[result["url"]] = result["raw_content"]
+    return raw_contents
+
+class Deadline:
+    """Wall-clock deadline shared by the phases of a tool call."""
+    
+    def __init__(self, seconds: Optional[float]):
+        """Start a deadline seconds from now, or an unbounded one if seconds is None."""
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+    
+    def remaining(self) -> Optional[float]:
+        """Return the seconds left (never negative), or None if unbounded."""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+async def gather_until_deadline(
+    coroutines: List[Any], 
+    deadline: Deadline, 
+    min_completed: Optional[int] = None
+) -> List[Any]:
+    """Run coroutines concurrently and collect the results available at the deadline.
+    
+    Args:
+        coroutines: Coroutines or futures to run
+        deadline: Deadline after which unfinished work is cancelled
+        min_completed: Stop waiting (and cancel the rest) once this many tasks have
+            succeeded, even before the deadline; None waits for every task
+        
+    Returns:
+        Results in input order, with None for work that did not finish successfully in time
+    """
+    remaining = deadline.remaining()
+    if remaining is None and min_completed is None:
+        results = await asyncio.gather(*coroutines, return_exceptions=True)
+        return [None if isinstance(result, BaseException) else result for result in results]
+    
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    if not tasks:
+        return []
+    if min_completed is None:
+        _, pending = await asyncio.wait(tasks, timeout=remaining)
+    else:
+        # Collect tasks as they complete until the quorum is met or the deadline passes
+        pending = set(tasks)
+        succeeded = 0
+        while pending and succeeded < min_completed:
+            done, pending = await asyncio.wait(
+                pending, timeout=deadline.remaining(), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            succeeded += sum(1 for task in done if task.exception() is None)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logging.warning(f"Stopped waiting with {len(pending)} of {len(tasks)} tasks unfinished, returning partial results")
+    
+    results = []
+    for task in tasks:
+        if task in pending or task.exception() is not None:
+            results.append(None)
+        else:
+            results.append(task.result())
+    return results
+
+def collapse_near_duplicates(
+    unique_results: Dict[str, dict], 
+    max_distance: int, 
+    max_chars: Optional[int] = None
+) -> Dict[str, dict]:
+    """Merge search results whose raw content is nearly identical.
+    
+    Args:
+        unique_results: Search results keyed by URL, already deduplicated exactly
+        max_distance: Maximum SimHash Hamming distance for two pages to be merged
+        max_chars: Length of the content prefix fingerprinted per page; None uses the whole page
+        
+    Returns:
+        Results keyed by the URL of the first copy of each page, with the URLs of
+        the other copies listed under 'duplicate_urls'
+    """
+    urls = list(unique_results.keys())
+    # Results without raw content cannot be compared, so they keep an empty text
+    texts = [(unique_results[url].get("raw_content") or "")[:max_chars] for url in urls]
+    
+    collapsed_results = {}
+    for group in group_near_duplicates(texts, max_distance=max_distance):
+        primary_url = urls[group[0]]
+        duplicate_urls = [urls[index] for index in group[1:]]
+        collapsed_results[primary_url] = {**unique_results[primary_url], "duplicate_urls": duplicate_urls}
+    return collapsed_results
+
+def select_top_results(
+    unique_results: Dict[str, dict], 
+    queries: List[str], 
+    max_results: int, 
+    rerank: bool = False
+) -> set[str]:
+    """Choose which search results to summarize under a global budget.
+    
+    Args:
+        unique_results: Search results keyed by URL, pooled across all queries
+        queries: Queries issued in this search call
+        max_results: Number of results to select; 0 or less selects every result
+        rerank: Whether to blend Tavily's score with a local BM25 score against the queries
+        
+    Returns:
+        URLs of the selected results
+    """
+    urls = list(unique_results.keys())
+    if max_results <= 0 or len(urls) <= max_results:
+        return set(urls)
+    
+    scores = [float(unique_results[url].get("score") or 0.0) for url in urls]
+    if rerank:
+        # Normalize BM25 to [0, 1] so it blends evenly with Tavily's [0, 1] score
+        local_scores = bm25_scores(
+            " ".join(queries),
+            [f"{unique_results[url].get('title', '')} {unique_results[url].get('content', '')}" for url in urls]
+        )
+        top_local_score = max(local_scores) or 1.0
+        scores = [
+            0.5 * score + 0.5 * local_score / top_local_score 
+            for score, local_score in zip(scores, local_scores)
+        ]
+    
+    ranked = sorted(range(len(urls)), key=lambda index: -scores[index])
+    return {urls[index] for index in ranked[:max_results]}
+
+def normalize_search_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a cache entry.
+    
+    Casefolds the query, collapses whitespace and strips quotes, brackets and
+    trailing sentence punctuation around it. Word order and symbols inside the query
+    are kept, so "flights London to Paris" and "flights Paris to London", or
+    "C++ memory model" and "C memory model", stay distinct.
+    
+    Args:
+        query: Search query as issued by the researcher
+        
+    Returns:
+        Canonical form of the query
+    """
+    normalized = " ".join(query.casefold().split())
+    return normalized.lstrip("\"'`([{ ").rstrip("\"'`)]}.,;:!? ")
+
+async def summarize_webpage(
+    model: BaseChatModel, 
+    webpage_content: str,
+    cache: Optional[SQLiteCache] = None,
+    cache_key: Optional[str] = None,
+    fallback_max_chars: int = 4000,
+    latency_policy: Optional["LatencyPolicy"] = None,
+    prompt_caching_model: Optional[str] = None
+) -> str:
     """Summarize webpage content using AI model with timeout protection.
     
     Args:
         model: The chat model configured for summarization
         webpage_content: Raw webpage content to be summarized
+        cache: Optional summary cache consulted before calling the model
+        cache_key: Key identifying this model and content in the cache
+        fallback_max_chars: Length bound of the local extractive summary used on failure
+        latency_policy: Timeout and hedging policy; defaults to a fixed 60 second timeout
+        prompt_caching_model: When set, send the static instructions first as a cacheable
+            system prompt for this model, followed by the page content
         
     Returns:
-        Formatted summary with key excerpts, or original content if summarization fails
+        Formatted summary with key excerpts, or a bounded extractive summary if summarization fails
     """
+    # Serve a previously generated summary without calling the model
+    if cache is not None and cache_key:
+        cached_summary = cache.get(cache_key)
+        if cached_summary is not None:
+            return cached_summary
+    
     try:
-        # Create prompt with current date context
-        prompt_content = summarize_webpage_prompt.format(
-            webpage_content=webpage_content, 
-            date=get_today_str()
-        )
+        if prompt_caching_model:
+            # Instructions form a byte-stable prefix shared by every page; content goes last
+            system_message = SystemMessage(content=summarize_webpage_system_prompt.format())
+            if supports_cache_control(prompt_caching_model):
+                system_message = with_cache_control(system_message)
+            messages = [
+                system_message,
+                HumanMessage(content=summarize_webpage_human_message.format(
+                    webpage_content=webpage_content, 
+                    date=get_today_str()
+                ))
+            ]
+        else:
+            # Create prompt with current date context
+            prompt_content = summarize_webpage_prompt.format(
+                webpage_content=webpage_content, 
+                date=get_today_str()
+            )
+            messages = [HumanMessage(content=prompt_content)]
         
-        # Execute summarization with timeout to prevent hanging
-        summary = await asyncio.wait_for(
-            model.ainvoke([HumanMessage(content=prompt_content)]),
-            timeout=60.0  # 60 second timeout for summarization
-        )
+        # Execute summarization with timeout (and optional hedging) to prevent hanging
+        latency_policy = latency_policy or LatencyPolicy()
+        summary = await latency_policy.ainvoke(model, messages)
         
         # Format the summary with structured sections
-        formatted_summary = (
-            f"<summary>\n{summary.summary}\n</summary>\n\n"
-            f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
-        )
+        formatted_summary = format_summary(summary)
+        
+        # Only successful summaries are cached so failures are retried next time
+        if cache is not None and cache_key:
+            cache.set(cache_key, formatted_summary)
         
         return formatted_summary
         
     except asyncio.TimeoutError:
-        # Timeout during summarization - return original content
-        logging.warning("Summarization timed out after 60 seconds, returning original content")
-        return webpage_content
+        # Timeout during summarization - fall back to a bounded local summary
+        logging.warning("Summarization timed out, returning extractive summary")
+        return format_fallback_summary(webpage_content, fallback_max_chars)
     except Exception as e:
-        # Other errors during summarization - log and return original content
-        logging.warning(f"Summarization failed with error: {str(e)}, returning original content")
-        return webpage_content
+        # Other errors during summarization - log and fall back to a bounded local summary
+        logging.warning(f"Summarization failed with error: {str(e)}, returning extractive summary")
+        return format_fallback_summary(webpage_content, fallback_max_chars)
+
+class LatencyTracker:
+    """Rolling window of observed call latencies per model."""
+    
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        """Initialize an empty tracker.
+        
+        Args:
+            window_size: Number of most recent samples kept per model
+            min_samples: Samples required before percentiles are reported
+        """
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+    
+    def record(self, model_name: str, seconds: float):
+        """Record how long a call to model_name took."""
+        self._samples.setdefault(model_name, deque(maxlen=self.window_size)).append(seconds)
+    
+    def percentile(self, model_name: str, quantile: float) -> Optional[float]:
+        """Return the latency at the given quantile, or None if too few samples exist."""
+        samples = self._samples.get(model_name)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+
+# Latencies of summarization calls shared by every tavily_search invocation
+summarization_latency = LatencyTracker()
+
+class LatencyPolicy:
+    """Timeout and hedging policy for summarization calls driven by observed latencies.
+    
+    With adaptive timeouts the timeout is twice the model's p99 latency (bounded by
+    max_timeout and a 10 second floor); with a hedge model a second request is fired
+    once the first one exceeds the p90 latency. Until enough latencies have been
+    observed the policy waits the full max_timeout and does not hedge.
+    """
+    
+    MIN_TIMEOUT = 10.0
+    
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        max_timeout: float = 60.0,
+        adaptive: bool = False,
+        hedge_model: Optional[BaseChatModel] = None,
+        tracker: LatencyTracker = summarization_latency
+    ):
+        """Create a policy for one summarization model.
+        
+        Args:
+            model_name: Model whose latencies are tracked; None disables tracking
+            max_timeout: Upper bound on the timeout, in seconds
+            adaptive: Whether to derive the timeout from observed latencies
+            hedge_model: Model used for the hedged request, or None to disable hedging
+            tracker: Latency tracker shared between calls
+        """
+        self.model_name = model_name
+        self.max_timeout = max_timeout
+        self.adaptive = adaptive
+        self.hedge_model = hedge_model
+        self.tracker = tracker
+    
+    def timeout(self) -> float:
+        """Return the timeout for the next call, in seconds."""
+        if not self.adaptive or not self.model_name:
+            return self.max_timeout
+        p99 = self.tracker.percentile(self.model_name, 0.99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.MIN_TIMEOUT, 2 * p99))
+    
+    def hedge_delay(self) -> Optional[float]:
+        """Return how long to wait before sending a hedged request, or None to not hedge."""
+        if self.hedge_model is None or not self.model_name:
+            return None
+        return self.tracker.percentile(self.model_name, 0.9)
+    
+    async def ainvoke(self, model: BaseChatModel, messages: List[MessageLikeRepresentation]) -> Any:
+        """Invoke model under this policy, returning the first successful response.
+        
+        Raises:
+            asyncio.TimeoutError: If no request succeeded within the timeout
+        """
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        timeout = self.timeout()
+        hedge_delay = self.hedge_delay()
+        
+        primary = asyncio.ensure_future(model.ainvoke(messages))
+        pending = {primary}
+        last_error: Optional[BaseException] = None
+        try:
+            if hedge_delay is not None and hedge_delay < timeout:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    pending.add(asyncio.ensure_future(self.hedge_model.ainvoke(messages)))
+            
+            while pending:
+                remaining = timeout - (loop.time() - started_at)
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(remaining, 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is None:
+                        # When the hedge wins, the primary's elapsed time is a lower bound
+                        # on its latency; recording it keeps p90 tracking a slowing primary
+                        # instead of hedging nearly every call against stale fast samples
+                        if self.model_name and (task is primary or not primary.done()):
+                            self.tracker.record(self.model_name, loop.time() - started_at)
+                        return task.result()
+                    last_error = task.exception()
+            
+            if last_error is not None and not pending:
+                raise last_error
+            # Count the timeout as a sample so a slow provider raises future timeouts
+            if self.model_name:
+                self.tracker.record(self.model_name, timeout)
+            raise asyncio.TimeoutError()
+        finally:
+            for task in pending:
+                task.cancel()
+
+def format_summary(summary: Summary) -> str:
+    """Render a structured summary as tagged text for the researcher."""
+    return (
+        f"<summary>\n{summary.summary}\n</summary>\n\n"
+        f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
+    )
+
+def format_fallback_summary(webpage_content: str, max_chars: int) -> str:
+    """Render a local extractive summary in the same tagged layout as model summaries."""
+    return f"<summary>\n{extractive_summary(webpage_content, max_chars)}\n</summary>"
+
+async def summarize_webpage_batch(
+    batch_model: BaseChatModel,
+    model: BaseChatModel,
+    webpage_contents: List[str],
+    cache: Optional[SQLiteCache] = None,
+    cache_keys: Optional[List[str]] = None,
+    fallback_max_chars: int = 4000,
+    latency_policy: Optional["LatencyPolicy"] = None,
+    prompt_caching_model: Optional[str] = None
+) -> List[str]:
+    """Summarize several short webpages in a single structured-output call.
+    
+    Cached pages are served from the cache and only the rest are sent to the model.
+    If the batched call fails or returns the wrong number of summaries, each page
+    is summarized individually instead.
+    
+    Args:
+        batch_model: Chat model configured for SummaryBatch structured output
+        model: Chat model configured for single-page Summary structured output
+        webpage_contents: Raw content of each webpage
+        cache: Optional summary cache shared with summarize_webpage
+        cache_keys: Cache key of each webpage, aligned with webpage_contents
+        fallback_max_chars: Length bound of the extractive summary used when a page fails
+        latency_policy: Timeout and hedging policy for individual page summaries
+        prompt_caching_model: Passed to summarize_webpage for individually summarized pages
+        
+    Returns:
+        Formatted summary for each webpage, in input order
+    """
+    cache_keys = cache_keys or [None] * len(webpage_contents)
+    summaries = [
+        cache.get(cache_key) if cache is not None and cache_key else None
+        for cache_key in cache_keys
+    ]
+    pending = [index for index, summary in enumerate(summaries) if summary is None]
+    
+    if len(pending) > 1:
+        try:
+            webpages = "\n\n".join(
+                f"<webpage_{position}>\n{webpage_contents[index]}\n</webpage_{position}>"
+                for position, index in enumerate(pending, start=1)
+            )
+            prompt_content = summarize_webpages_batch_prompt.format(
+                webpage_count=len(pending),
+                webpages=webpages,
+                date=get_today_str()
+            )
+            response = await asyncio.wait_for(
+                batch_model.ainvoke([HumanMessage(content=prompt_content)]),
+                timeout=latency_policy.max_timeout if latency_policy else 60.0
+            )
+            if len(response.summaries) != len(pending):
+                raise ValueError(
+                    f"expected {len(pending)} summaries, got {len(response.summaries)}"
+                )
+            
+            for index, summary in zip(pending, response.summaries):
+                summaries[index] = format_summary(summary)
+                if cache is not None and cache_keys[index]:
+                    cache.set(cache_keys[index], summaries[index])
+            return summaries
+        except Exception as e:
+            logging.warning(f"Batched summarization failed with error: {str(e)}, summarizing pages individually")
+    
+    # Summarize remaining pages one by one (single pending page or batch failure)
+    individual_summaries = await asyncio.gather(*(
+        summarize_webpage(
+            model, 
+            webpage_contents[index], 
+            cache=cache, 
+            cache_key=cache_keys[index],
+            fallback_max_chars=fallback_max_chars,
+            latency_policy=latency_policy,
+            prompt_caching_model=prompt_caching_model
+        )
+        for index in pending
+    ))
+    for index, summary in zip(pending, individual_summaries):
+        summaries[index] = summary
+    return summaries
+
+# Default directory for on-disk caches, next to the output/ folder in the project root
+CACHE_DIR = Path(__file__).parent.parent.parent / ".cache"
+
+# Upper bound on cached search responses, which are much larger than summaries
+SEARCH_CACHE_MAX_ENTRIES = 2000
+
+# Caches shared by every researcher in the process, keyed by database path or backend
+_summary_caches: Dict[str, SQLiteCache] = {}
+_search_caches: Dict[SearchCacheBackend, BaseCache] = {}
+
+def get_summary_cache(configurable: Configuration) -> Optional[SQLiteCache]:
+    """Get the process-wide webpage summary cache if caching is enabled.
+    
+    Args:
+        configurable: Configuration with summary cache settings
+        
+    Returns:
+        Shared SQLite-backed summary cache, or None if caching is disabled
+    """
+    if not configurable.summary_cache_enabled:
+        return None
+    
+    cache_path = configurable.summary_cache_path or str(CACHE_DIR / "summaries.sqlite")
+    
+    summary_cache = _summary_caches.get(cache_path)
+    if summary_cache is None:
+        summary_cache = SQLiteCache(cache_path)
+        _summary_caches[cache_path] = summary_cache
+    
+    # Apply the latest limits so configuration changes take effect without a restart
+    summary_cache.default_ttl_seconds = configurable.summary_cache_ttl_seconds
+    summary_cache.max_entries = configurable.summary_cache_max_entries
+    return summary_cache
+
+def get_search_cache(configurable: Configuration) -> Optional[BaseCache]:
+    """Get the process-wide Tavily search response cache for the configured backend.
+    
+    Args:
+        configurable: Configuration with the search cache backend
+        
+    Returns:
+        Shared in-memory or SQLite cache, or None if search caching is disabled
+    """
+    backend = SearchCacheBackend(get_config_value(configurable.search_cache_backend))
+    if backend == SearchCacheBackend.NONE:
+        return None
+    
+    search_cache = _search_caches.get(backend)
+    if search_cache is None:
+        if backend == SearchCacheBackend.SQLITE:
+            search_cache = SQLiteCache(CACHE_DIR / "search.sqlite", max_entries=SEARCH_CACHE_MAX_ENTRIES)
+        else:
+            search_cache = InMemoryCache(max_entries=SEARCH_CACHE_MAX_ENTRIES)
+        _search_caches[backend] = search_cache
+    return search_cache
+
+# In-flight summarizations shared between concurrent tavily_search calls
+summarization_flights = SingleFlight()
+
+def get_summarization_flight_scope(configurable: Configuration, config: RunnableConfig) -> Optional[str]:
+    """Determine the scope in which in-flight summarizations are shared.
+    
+    Args:
+        configurable: Configuration with the summarization dedup scope
+        config: Runtime configuration containing the thread identifier
+        
+    Returns:
+        Scope identifier prefixed to single-flight keys, or None if sharing is disabled
+    """
+    dedup_scope = DedupScope(get_config_value(configurable.summarization_dedup_scope))
+    if dedup_scope == DedupScope.OFF:
+        return None
+    if dedup_scope == DedupScope.PROCESS:
+        return "process"
+    
+    # Run scope: researchers of the same thread share work, other threads do not
+    thread_id = (config or {}).get("configurable", {}).get("thread_id")
+    return f"run:{thread_id or 'default'}"
+
+# Blob stores shared by every researcher in the process, keyed by root directory
+_blob_stores: Dict[str, BlobStore] = {}
+
+def get_blob_store(configurable: Configuration) -> Optional[BlobStore]:
+    """Get the process-wide blob store for offloaded payloads if offloading is enabled.
+    
+    Args:
+        configurable: Configuration with blob store settings
+        
+    Returns:
+        Shared filesystem blob store, or None if offloading is disabled
+    """
+    if not configurable.blob_store_enabled:
+        return None
+    return open_blob_store(configurable.blob_store_path)
+
+def open_blob_store(blob_store_path: Optional[str] = None) -> BlobStore:
+    """Get the process-wide blob store at a path, defaulting to .cache/blobs in the project root."""
+    blob_store_path = blob_store_path or str(CACHE_DIR / "blobs")
+    blob_store = _blob_stores.get(blob_store_path)
+    if blob_store is None:
+        blob_store = BlobStore(blob_store_path)
+        _blob_stores[blob_store_path] = blob_store
+    return blob_store
+
+def resolve_blob_messages(
+    messages: List[MessageLikeRepresentation], 
+    blob_store: Optional[BlobStore]
+) -> List[MessageLikeRepresentation]:
+    """Replace blob references in message contents with the stored content.
+    
+    Args:
+        messages: Messages whose contents may be blob references
+        blob_store: Store the references point into, or None if offloading is disabled
+        
+    Returns:
+        Messages with resolved contents; unchanged messages are returned as-is
+    """
+    if blob_store is None:
+        return messages
+    return [
+        message.model_copy(update={"content": blob_store.resolve(message.content)})
+        if is_blob_ref(message.content) else message
+        for message in messages
+    ]
+
+def resolve_blob_refs(values: List[str], configurable: Optional[Configuration] = None) -> List[str]:
+    """Replace blob references in a list of strings, such as raw_notes, with the stored content.
+    
+    Args:
+        values: Strings that may be blob references
+        configurable: Configuration naming the blob store; when omitted or offloading is
+            disabled, references are resolved against the default store location
+        
+    Returns:
+        The strings with references resolved; the original list if it holds no references
+    """
+    if not any(is_blob_ref(value) for value in values):
+        return values
+    blob_store = (get_blob_store(configurable) if configurable is not None else None) or open_blob_store()
+    return [blob_store.resolve(value) for value in values]
+
+def offload_to_blob_store(content: str, configurable: Configuration) -> str:
+    """Move content above the configured size into the blob store and return its reference.
+    
+    Returns the content unchanged when offloading is disabled or the content is small.
+    """
+    blob_store = get_blob_store(configurable)
+    if blob_store is None or not isinstance(content, str):
+        return content
+    return blob_store.offload(content, configurable.blob_store_threshold_chars)
+
+##########################
+# Client Pool Utils
+##########################
+
+class ClientPool:
+    """Process-wide registry of long-lived API clients.
+    
+    Clients hold HTTP connection pools bound to the event loop they were created
+    on, so the registry keeps a separate set of clients per running loop and drops
+    them automatically when the loop is garbage collected.
+    """
+    
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Any, Any]] = weakref.WeakKeyDictionary()
+    
+    def get_or_create(self, key: Any, factory: Callable[[], Any]) -> Any:
+        """Return the client stored under key for the running loop, creating it if needed.
+        
+        Args:
+            key: Hashable identifier of the client settings
+            factory: Zero-argument callable building a new client
+            
+        Returns:
+            The pooled client
+        """
+        loop_clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        client = loop_clients.get(key)
+        if client is None:
+            client = factory()
+            loop_clients[key] = client
+        return client
+    
+    async def aclose(self):
+        """Close and forget every client created on the running loop."""
+        loop_clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in loop_clients.values():
+            await close_client(client)
+
+async def close_client(client: Any):
+    """Close an SDK or chat model client, releasing its HTTP connections.
+    
+    Args:
+        client: Tavily client, chat model, or any object exposing close()/aclose()
+    """
+    # Chat models wrap the provider SDK client that owns the connection pool
+    for attribute in ("root_async_client", "async_client", "_async_client"):
+        inner_client = getattr(client, attribute, None)
+        if inner_client is not None and inner_client is not client:
+            await close_client(inner_client)
+    
+    closer = getattr(client, "aclose", None) or getattr(client, "close", None)
+    if not callable(closer):
+        return
+    try:
+        result = closer()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logging.warning(f"Failed to close pooled client {type(client).__name__}: {e}")
+
+def fingerprint_api_key(api_key: Optional[str]) -> str:
+    """Hash an API key so it can be used in registry keys without being stored in clear."""
+    if not api_key:
+        return "none"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+# Long-lived Tavily clients and chat models shared across tool invocations
+client_pool = ClientPool()
+
+def get_tavily_client(api_key: Optional[str]) -> AsyncTavilyClient:
+    """Get the pooled Tavily client for an API key.
+    
+    Args:
+        api_key: Tavily API key, or None to use the TAVILY_API_KEY environment variable
+        
+    Returns:
+        Shared AsyncTavilyClient for the running event loop
+    """
+    return client_pool.get_or_create(
+        ("tavily", fingerprint_api_key(api_key)),
+        lambda: AsyncTavilyClient(api_key=api_key)
+    )
+
+def get_summarization_model(
+    configurable: Configuration, 
+    config: RunnableConfig, 
+    model_name: Optional[str] = None
+) -> BaseChatModel:
+    """Get the pooled summarization chat model for the configured model settings.
+    
+    Args:
+        configurable: Configuration with summarization model settings
+        config: Runtime configuration for API key access
+        model_name: Model to use instead of the configured summarization model
+        
+    Returns:
+        Shared chat model for the running event loop
+    """
+    model_name = model_name or configurable.summarization_model
+    model_api_key = get_api_key_for_model(model_name, config)
+    return client_pool.get_or_create(
+        (
+            "summarization",
+            model_name,
+            configurable.summarization_model_max_tokens,
+            fingerprint_api_key(model_api_key)
+        ),
+        lambda: init_chat_model(
+            model=model_name,
+            max_tokens=configurable.summarization_model_max_tokens,
+            api_key=model_api_key,
+            tags=["langsmith:nostream"]
+        )
+    )
+
+async def close_pooled_clients():
+    """Shut down pooled clients and caches.
+    
+    Call this from the application's shutdown hook (for example a FastAPI lifespan
+    handler) so HTTP connections and cache databases are released cleanly.
+    """
+    await client_pool.aclose()
+    for cache in [*_summary_caches.values(), *_search_caches.values()]:
+        cache.close()
+    _summary_caches.clear()
+    _search_caches.clear()
+
+##########################
+# Model Registry Utils
+##########################
+
+# Configurable chat model shared by every node; settings are supplied per call via with_config
+configurable_model = init_chat_model(
+    configurable_fields=("model", "max_tokens", "api_key"),
+)
+
+class RunnableRegistry:
+    """Bounded LRU registry of configured runnables keyed by their settings."""
+    
+    def __init__(self, max_size: int = 256):
+        """Initialize an empty registry holding at most max_size runnables."""
+        self.max_size = max_size
+        self._runnables: OrderedDict[tuple, Runnable] = OrderedDict()
+    
+    def get_or_create(self, key: tuple, factory: Callable[[], Runnable]) -> Runnable:
+        """Return the runnable stored under key, building it with factory if needed."""
+        runnable = self._runnables.get(key)
+        if runnable is None:
+            runnable = factory()
+            self._runnables[key] = runnable
+            if len(self._runnables) > self.max_size:
+                self._runnables.popitem(last=False)
+        else:
+            self._runnables.move_to_end(key)
+        return runnable
+
+# Configured runnables reused across node invocations, researchers and runs
+runnable_registry = RunnableRegistry()
+
+def get_tool_set_fingerprint(tools: Optional[List[Any]]) -> Optional[str]:
+    """Fingerprint a tool list by name, description and argument schema.
+    
+    Tools rebuilt on every call (for example RAG and MCP tools) get the same
+    fingerprint as long as their schemas are unchanged, so bound models can be reused.
+    
+    Args:
+        tools: Tools, tool dicts or Pydantic tool classes passed to bind_tools
+        
+    Returns:
+        Hex digest identifying the tool set, or None if no tools are bound
+    """
+    if tools is None:
+        return None
+    
+    hasher = hashlib.sha256()
+    for bound_tool in tools:
+        if isinstance(bound_tool, dict):
+            descriptor = json.dumps(bound_tool, sort_keys=True, default=str)
+        elif isinstance(bound_tool, BaseTool):
+            descriptor = json.dumps(
+                [bound_tool.name, bound_tool.description, bound_tool.args], 
+                sort_keys=True, 
+                default=str
+            )
+        else:
+            # Pydantic models and functions are identified by their import path
+            descriptor = f"{getattr(bound_tool, '__module__', '')}.{getattr(bound_tool, '__qualname__', repr(bound_tool))}"
+        hasher.update(descriptor.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+def get_configured_model(
+    model_config: Dict[str, Any],
+    tools: Optional[List[Any]] = None,
+    output_schema: Optional[type] = None,
+    max_retries: Optional[int] = None
+) -> Runnable:
+    """Get the shared configurable model bound with tools or structured output, memoized.
+    
+    Equivalent to configurable_model[.bind_tools(tools)][.with_structured_output(schema)]
+    [.with_retry(stop_after_attempt=max_retries)].with_config(model_config), but built
+    only once per distinct combination of settings.
+    
+    Args:
+        model_config: Runtime model settings (model, max_tokens, api_key, tags)
+        tools: Tools to bind, if any
+        output_schema: Pydantic schema for structured output, if any
+        max_retries: Number of attempts for with_retry, or None for no retry wrapper
+        
+    Returns:
+        Configured runnable ready to invoke
+    """
+    registry_key = (
+        model_config.get("model"),
+        model_config.get("max_tokens"),
+        fingerprint_api_key(model_config.get("api_key")),
+        tuple(model_config.get("tags", [])),
+        get_tool_set_fingerprint(tools),
+        output_schema,
+        max_retries
+    )
+    
+    def build_model():
+        model = configurable_model
+        if tools is not None:
+            model = model.bind_tools(tools)
+        if output_schema is not None:
+            model = model.with_structured_output(output_schema)
+        if max_retries:
+            model = model.with_retry(stop_after_attempt=max_retries)
+        return model.with_config(model_config)
+    
+    return runnable_registry.get_or_create(registry_key, build_model)
+
+##########################
+# Prompt Caching Utils
+##########################
+
+# Anthropic caches the prompt prefix up to each content block marked with this
+CACHE_CONTROL_EPHEMERAL = {"type": "ephemeral"}
+
+def supports_cache_control(model_name: Optional[str]) -> bool:
+    """Check whether a model needs explicit cache_control breakpoints for prefix caching.
+    
+    OpenAI and Gemini cache repeated prompt prefixes automatically; Anthropic only
+    caches prefixes that end at a content block marked with cache_control.
+    """
+    return bool(model_name) and model_name.lower().startswith("anthropic:")
+
+def with_cache_control(message: MessageLikeRepresentation) -> MessageLikeRepresentation:
+    """Return a copy of message whose last content block is marked as a cache breakpoint.
+    
+    Messages without text content (such as tool-call-only AI messages) are returned unchanged.
+    """
+    content = message.content
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}] if content else []
+    else:
+        blocks = [
+            dict(block) if isinstance(block, dict) else {"type": "text", "text": block}
+            for block in content
+        ]
+    if not blocks:
+        return message
+    
+    blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL_EPHEMERAL}
+    return message.model_copy(update={"content": blocks})
+
+def add_cache_breakpoints(
+    messages: List[MessageLikeRepresentation], 
+    model_name: Optional[str]
+) -> List[MessageLikeRepresentation]:
+    """Mark the system prompt and the end of the history as prompt cache breakpoints.
+    
+    The system breakpoint caches the tool definitions and instructions shared by
+    every call; the trailing breakpoint caches the transcript so the next turn,
+    which appends to it, only pays for its new messages. Messages stored in graph
+    state are never modified.
+    
+    Args:
+        messages: Messages about to be sent to the model
+        model_name: Model the messages are sent to
+        
+    Returns:
+        Messages with breakpoints added, or the original list if the provider caches automatically
+    """
+    if not supports_cache_control(model_name) or not messages:
+        return messages
+    
+    messages = list(messages)
+    if messages[0].type == "system":
+        messages[0] = with_cache_control(messages[0])
+    
+    # Anchor the history breakpoint on the last message that has text content
+    for index in range(len(messages) - 1, 0, -1):
+        marked = with_cache_control(messages[index])
+        if marked is not messages[index]:
+            messages[index] = marked
+            break
+    return messages
+
+def log_prompt_cache_usage(node_name: str, response: Any):
+    """Log how many input tokens of a model call were served from the provider prompt cache."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    cache_read = details.get("cache_read") or 0
+    cache_creation = details.get("cache_creation") or 0
+    logging.info(
+        f"{node_name} prompt cache: {cache_read} of {usage.get('input_tokens', 0)} input tokens read "
+        f"from cache, {cache_creation} written"
+    )
 
 ##########################
 # Reflection Tool Utils
@@ -702,8 +1817,136 @@ def generate_mcp_tool_description(mcp_tools: list[BaseTool]) -> str:
     return "\n" + "\n".join(descriptions) if descriptions else ""
 
 def get_notes_from_tool_calls(messages: list[MessageLikeRepresentation]):
-    """Extract notes from tool call messages."""
-    return [tool_msg.content for tool_msg in filter_messages(messages, include_types="tool")]
+    """Extract notes from tool call messages, skipping copies of research reused for duplicate topics."""
+    return [
+        tool_msg.content for tool_msg in filter_messages(messages, include_types="tool")
+        if not tool_msg.additional_kwargs.get("reused_research_from")
+    ]
+
+def split_supervisor_rounds(messages: list[MessageLikeRepresentation]) -> tuple[list, list[list]]:
+    """Split supervisor messages into the leading context and completed rounds.
+    
+    Args:
+        messages: Supervisor messages, starting with the system prompt and research brief
+        
+    Returns:
+        The messages before the first AI message, and the rounds that follow, each an
+        AI message with the tool messages answering it
+    """
+    first_ai_index = next(
+        (index for index, message in enumerate(messages) if isinstance(message, AIMessage)), 
+        len(messages)
+    )
+    rounds = []
+    for message in messages[first_ai_index:]:
+        if isinstance(message, AIMessage) or not rounds:
+            rounds.append([message])
+        else:
+            rounds[-1].append(message)
+    return messages[:first_ai_index], rounds
+
+def format_supervisor_rounds(rounds: list[list[MessageLikeRepresentation]], first_round_number: int = 1) -> str:
+    """Render supervisor rounds as text, pairing each tool call with its result."""
+    sections = []
+    for round_number, round_messages in enumerate(rounds, start=first_round_number):
+        results = {
+            message.tool_call_id: str(message.content) 
+            for message in round_messages if message.type == "tool"
+        }
+        lines = [f"<Round {round_number}>"]
+        if round_messages[0].content:
+            lines.append(f"Supervisor: {round_messages[0].content}")
+        for tool_call in getattr(round_messages[0], "tool_calls", []):
+            if tool_call["name"] == "think_tool":
+                lines.append(f"Reflection: {tool_call['args'].get('reflection', '')}")
+            elif tool_call["name"] == "ConductResearch":
+                lines.append(f"Delegated research topic: {tool_call['args'].get('research_topic', '')}")
+                lines.append(f"Findings: {results.get(tool_call['id'], 'No result')}")
+        lines.append(f"</Round {round_number}>")
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+def get_completed_research(messages: list[MessageLikeRepresentation]) -> list[tuple[str, str, str]]:
+    """Return the ConductResearch topics in messages that produced research findings.
+    
+    Topics whose result was an error or a partial, interrupted result are excluded,
+    so they can be researched again, as are results reused from another topic, so
+    matches always point at the original research.
+    
+    Returns:
+        (research topic, compressed research findings, tool call ID) tuples in conversation order
+    """
+    results = {
+        message.tool_call_id: str(message.content) 
+        for message in filter_messages(messages, include_types="tool")
+        if not message.additional_kwargs.get("reused_research_from")
+    }
+    completed = []
+    for message in messages:
+        if not isinstance(message, AIMessage):
+            continue
+        for tool_call in message.tool_calls:
+            result = results.get(tool_call["id"])
+            if tool_call["name"] != "ConductResearch" or result is None:
+                continue
+            if result.startswith(("Error", "Skipped", "Research on this topic was")):
+                continue
+            completed.append((tool_call["args"].get("research_topic", ""), result, tool_call["id"]))
+    return completed
+
+def deduplicate_research_calls(
+    tool_calls: list[dict], 
+    earlier_messages: list[MessageLikeRepresentation], 
+    threshold: float
+) -> tuple[list[dict], list[ToolMessage], list[tuple[dict, dict]]]:
+    """Drop ConductResearch calls whose topic closely matches earlier or concurrent topics.
+    
+    Each topic is compared by lexical similarity against the topics already researched
+    in this run and the topics kept earlier in the same round. A duplicate of an earlier
+    topic is answered with that topic's findings instead of spawning a researcher. A
+    duplicate of a topic kept in the same round is paired with the call it matches, so
+    the caller can hand it that call's result once the round has run.
+    
+    Args:
+        tool_calls: ConductResearch calls of the current round
+        earlier_messages: Supervisor messages before the current round
+        threshold: Minimum similarity for two topics to count as duplicates
+        
+    Returns:
+        The calls to run, a ToolMessage for each call answered from an earlier round,
+        and (duplicate call, matching kept call) pairs for same-round duplicates
+    """
+    completed_research = get_completed_research(earlier_messages)
+    earlier_topics = [topic for topic, _, _ in completed_research]
+    kept_calls = []
+    reused_messages = []
+    round_duplicates = []
+    for tool_call in tool_calls:
+        topic = tool_call["args"]["research_topic"]
+        round_topics = [kept_call["args"]["research_topic"] for kept_call in kept_calls]
+        similarities = cosine_similarities(topic, earlier_topics + round_topics)
+        best_index = max(range(len(similarities)), key=similarities.__getitem__, default=None)
+        if best_index is None or similarities[best_index] < threshold:
+            kept_calls.append(tool_call)
+            continue
+        
+        if best_index >= len(earlier_topics):
+            round_duplicates.append((tool_call, kept_calls[best_index - len(earlier_topics)]))
+            continue
+        
+        matched_topic, findings, matched_call_id = completed_research[best_index]
+        reused_messages.append(ToolMessage(
+            content=(
+                f"This topic closely matches research already completed in an earlier round "
+                f"(similarity {similarities[best_index]:.2f}): \"{matched_topic}\". "
+                f"Findings from that research:\n\n{findings}"
+            ),
+            name="ConductResearch",
+            tool_call_id=tool_call["id"],
+            # Tagged so the copy is left out of the notes and never matched in place of the original
+            additional_kwargs={"reused_research_from": matched_call_id}
+        ))
+    return kept_calls, reused_messages, round_duplicates
 
 ##########################
 # Model Provider Native Websearch Utils
@@ -2,7 +2,7 @@ from typing import cast
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
-from open_deep_research.utils import get_today_str
+from open_deep_research.utils import get_today_str, resolve_blob_refs
 from tests.prompts import RELEVANCE_PROMPT, STRUCTURE_PROMPT, GROUNDEDNESS_PROMPT, OVERALL_QUALITY_PROMPT, CORRECTNESS_PROMPT, COMPLETENESS_PROMPT
 
 eval_model = ChatOpenAI(
@@ -133,7 +133,8 @@ class GroundednessScore(BaseModel):
 
 def eval_groundedness(inputs: dict, outputs: dict):
     final_report = outputs["final_report"]
-    context = str(outputs["raw_notes"])
+    # Offloaded raw notes are stored as blob references; ground against their content
+    context = str(resolve_blob_refs(outputs["raw_notes"]))
 
     user_input_content = GROUNDEDNESS_PROMPT.format(context=context, report=final_report, today=get_today_str())
     if isinstance(eval_model, ChatAnthropic):
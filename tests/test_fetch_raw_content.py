@@ -0,0 +1,29 @@
+import asyncio
+
+from open_deep_research import utils
+from open_deep_research.utils import TAVILY_EXTRACT_BATCH_SIZE, fetch_raw_content
+
+
+class FailingBatchTavilyClient:
+    """Tavily client stub whose second extract batch raises."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def extract(self, urls):
+        self.calls += 1
+        if self.calls == 2:
+            raise RuntimeError("extract failed")
+        return {"results": [{"url": url, "raw_content": f"content of {url}"} for url in urls]}
+
+
+def test_fetch_raw_content_skips_failed_batch_without_timeout(monkeypatch):
+    monkeypatch.setattr(utils, "get_tavily_client", lambda api_key: FailingBatchTavilyClient())
+    urls = [f"https://example.com/{i}" for i in range(TAVILY_EXTRACT_BATCH_SIZE * 3)]
+
+    raw_contents = asyncio.run(fetch_raw_content(urls, timeout=None))
+
+    failed_batch = urls[TAVILY_EXTRACT_BATCH_SIZE:2 * TAVILY_EXTRACT_BATCH_SIZE]
+    assert len(raw_contents) == TAVILY_EXTRACT_BATCH_SIZE * 2
+    assert not set(failed_batch) & set(raw_contents)
+    assert raw_contents[urls[0]] == f"content of {urls[0]}"
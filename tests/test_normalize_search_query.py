@@ -0,0 +1,9 @@
+from open_deep_research.utils import normalize_search_query
+
+
+def test_queries_with_different_word_order_get_different_cache_keys():
+    assert normalize_search_query("flights London to Paris") != normalize_search_query("flights Paris to London")
+
+
+def test_queries_differing_in_case_and_spacing_share_a_cache_key():
+    assert normalize_search_query("  Flights London  to Paris? ") == normalize_search_query("flights london to paris")
@@ -0,0 +1,25 @@
+from langchain_core.messages import AIMessage, ToolMessage
+
+from open_deep_research.token_budget import pack_turns_into_chunks
+
+
+def test_split_turn_keeps_only_its_own_tool_use_block():
+    tool_call_ids = ["call_0", "call_1", "call_2"]
+    ai_message = AIMessage(
+        content=[{"type": "text", "text": "Searching."}] + [
+            {"type": "tool_use", "id": tool_call_id, "name": "tavily_search", "input": {}}
+            for tool_call_id in tool_call_ids
+        ],
+        tool_calls=[{"name": "tavily_search", "args": {}, "id": tool_call_id} for tool_call_id in tool_call_ids],
+    )
+    turn = [ai_message] + [ToolMessage(content="result " * 1000, tool_call_id=tool_call_id) for tool_call_id in tool_call_ids]
+
+    chunks = pack_turns_into_chunks([turn], "anthropic:claude-sonnet-4", 1500)
+
+    assert len(chunks) == len(tool_call_ids)
+    for chunk, tool_call_id in zip(chunks, tool_call_ids):
+        split_message, tool_message = chunk
+        tool_use_ids = [block["id"] for block in split_message.content if block.get("type") == "tool_use"]
+        assert tool_use_ids == [tool_call_id]
+        assert [call["id"] for call in split_message.tool_calls] == [tool_call_id]
+        assert tool_message.tool_call_id == tool_call_id
@@ -0,0 +1,7 @@
+from open_deep_research.text_utils import strip_boilerplate
+
+
+def test_strip_boilerplate_keeps_content_lines_starting_with_chrome_words():
+    page = "Home\nMenu\nHome prices rose 5% in March.\nSearch engines index pages.\nCookie settings"
+
+    assert strip_boilerplate(page) == "Home prices rose 5% in March.\nSearch engines index pages."